@@ -0,0 +1,146 @@
+"""
+Numba-compiled PoW search.
+
+Fallback for machines where the _powmine C extension is not built: the
+same midstate trick (hash the fixed payload prefix once, then compress
+only the final padded block(s) per nonce), JIT-compiled and spread over
+numba's thread pool. Importing this module raises ImportError when numba
+is not installed.
+"""
+
+import hashlib
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+_K = np.array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+], dtype=np.uint64)
+
+_H = np.array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+    0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+], dtype=np.uint64)
+
+# 32-bit words are kept in uint64 so numba never mixes signednesses.
+_M32 = np.uint64(0xFFFFFFFF)
+_CHUNK = 1 << 20        # nonces per thread per _search call
+_CHECK_EVERY = 4096     # iterations between looks at the shared found flag
+
+
+@njit(cache=True, inline="always")
+def _rotr(x, n):
+    return ((x >> np.uint64(n)) | (x << np.uint64(32 - n))) & _M32
+
+
+@njit(cache=True)
+def _compress(state, blocks, nblocks, w):
+    for b in range(nblocks):
+        off = 64 * b
+        for i in range(16):
+            j = off + 4 * i
+            w[i] = ((np.uint64(blocks[j]) << np.uint64(24))
+                    | (np.uint64(blocks[j + 1]) << np.uint64(16))
+                    | (np.uint64(blocks[j + 2]) << np.uint64(8))
+                    | np.uint64(blocks[j + 3]))
+        for i in range(16, 64):
+            x = w[i - 15]
+            y = w[i - 2]
+            s0 = _rotr(x, 7) ^ _rotr(x, 18) ^ (x >> np.uint64(3))
+            s1 = _rotr(y, 17) ^ _rotr(y, 19) ^ (y >> np.uint64(10))
+            w[i] = (w[i - 16] + s0 + w[i - 7] + s1) & _M32
+
+        a, bb, c, d = state[0], state[1], state[2], state[3]
+        e, f, g, h = state[4], state[5], state[6], state[7]
+        for i in range(64):
+            S1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+            ch = (e & f) ^ (~e & g & _M32)
+            t1 = (h + S1 + ch + _K[i] + w[i]) & _M32
+            S0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+            maj = (a & bb) ^ (a & c) ^ (bb & c)
+            t2 = (S0 + maj) & _M32
+            h = g
+            g = f
+            f = e
+            e = (d + t1) & _M32
+            d = c
+            c = bb
+            bb = a
+            a = (t1 + t2) & _M32
+        state[0] = (state[0] + a) & _M32
+        state[1] = (state[1] + bb) & _M32
+        state[2] = (state[2] + c) & _M32
+        state[3] = (state[3] + d) & _M32
+        state[4] = (state[4] + e) & _M32
+        state[5] = (state[5] + f) & _M32
+        state[6] = (state[6] + g) & _M32
+        state[7] = (state[7] + h) & _M32
+
+
+@njit(cache=True, inline="always")
+def _meets(state, bits):
+    i = 0
+    while bits >= 32:
+        if state[i] != 0:
+            return False
+        bits -= 32
+        i += 1
+    return bits == 0 or (state[i] >> np.uint64(32 - bits)) == 0
+
+
+@njit(parallel=True, cache=True)
+def _search(mid, tail, nblocks, nonce_off, bits, start, nthreads, results):
+    """results[t] = first hit in thread t's range, or -1."""
+    found = np.zeros(1, dtype=np.uint8)
+    for t in prange(nthreads):
+        buf = tail.copy()
+        st = np.empty(8, dtype=np.uint64)
+        w = np.empty(64, dtype=np.uint64)
+        lo = start + t * _CHUNK
+        results[t] = -1
+        for k in range(_CHUNK):
+            if k % _CHECK_EVERY == 0 and found[0] != 0:
+                break
+            n = lo + k
+            for b in range(8):
+                buf[nonce_off + b] = np.uint8((n >> (56 - 8 * b)) & 0xFF)
+            st[:] = mid
+            _compress(st, buf, nblocks, w)
+            if _meets(st, bits):
+                results[t] = n
+                found[0] = 1
+                break
+
+
+def mine(payload: bytes, difficulty: int) -> tuple[str, str]:
+    """Same contract as lime.message.mine_pow."""
+    full = len(payload) - len(payload) % 64
+    rem = len(payload) - full
+    tail_len = 64 if rem + 8 + 1 + 8 <= 64 else 128
+
+    mid = _H.copy()
+    w = np.empty(64, dtype=np.uint64)
+    _compress(mid, np.frombuffer(payload[:full], dtype=np.uint8), full // 64, w)
+
+    tail = np.zeros(tail_len, dtype=np.uint8)
+    tail[:rem] = np.frombuffer(payload[full:], dtype=np.uint8)
+    tail[rem + 8] = 0x80
+    tail[tail_len - 8:] = np.frombuffer(((len(payload) + 8) * 8).to_bytes(8, "big"), dtype=np.uint8)
+
+    nthreads = get_num_threads()
+    results = np.empty(nthreads, dtype=np.int64)
+    start = 0
+    while True:
+        _search(mid, tail, tail_len // 64, rem, difficulty, start, nthreads, results)
+        hits = results[results >= 0]
+        if hits.size:
+            nonce = int(hits.min()).to_bytes(8, "big")
+            return nonce.hex(), hashlib.sha256(payload + nonce).hexdigest()
+        start += nthreads * _CHUNK
@@ -0,0 +1,466 @@
+/*
+ * Native hashcash search for lime.message.mine_pow.
+ *
+ * The payload prefix is hashed once into a SHA-256 midstate; each nonce
+ * then only costs the compression of the final one or two padded blocks.
+ * On x86 the SHA-NI instructions are used when the CPU has them, on
+ * ARMv8 the SHA2 crypto extension when the compiler targets it, and a
+ * portable C compression everywhere else.  The selected implementation is
+ * checked against known vectors at import time; if nothing passes, the
+ * import fails and mine_pow keeps its pure-Python loop.
+ *
+ * search() releases the GIL, so callers can run several searches over
+ * disjoint nonce ranges from Python threads.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <stdint.h>
+#include <string.h>
+
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+#define LIME_X86 1
+#include <immintrin.h>
+#if defined(_MSC_VER)
+#include <intrin.h>
+#else
+#include <cpuid.h>
+#endif
+#endif
+
+#if defined(__aarch64__) && (defined(__ARM_FEATURE_SHA2) || defined(__ARM_FEATURE_CRYPTO))
+#define LIME_ARM_SHA2 1
+#include <arm_neon.h>
+#endif
+
+#if defined(LIME_X86) && (defined(__GNUC__) || defined(__clang__))
+#define LIME_TARGET_SHANI __attribute__((target("sha,sse4.1,ssse3")))
+#else
+#define LIME_TARGET_SHANI
+#endif
+
+typedef void (*compress_fn)(uint32_t state[8], const uint8_t *blocks, size_t nblocks);
+
+static const uint32_t K256[64] = {
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+};
+
+static const uint32_t H256[8] = {
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+    0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+};
+
+/* ------------------------------------------------------------------ */
+/* Portable compression                                                */
+/* ------------------------------------------------------------------ */
+
+#define ROR(x, n) (((x) >> (n)) | ((x) << (32 - (n))))
+
+static void
+compress_generic(uint32_t state[8], const uint8_t *blocks, size_t nblocks)
+{
+    uint32_t w[64];
+    while (nblocks--) {
+        uint32_t a = state[0], b = state[1], c = state[2], d = state[3];
+        uint32_t e = state[4], f = state[5], g = state[6], h = state[7];
+        int i;
+        for (i = 0; i < 16; i++) {
+            const uint8_t *p = blocks + 4 * i;
+            w[i] = ((uint32_t)p[0] << 24) | ((uint32_t)p[1] << 16) |
+                   ((uint32_t)p[2] << 8) | (uint32_t)p[3];
+        }
+        for (i = 16; i < 64; i++) {
+            uint32_t s0 = ROR(w[i - 15], 7) ^ ROR(w[i - 15], 18) ^ (w[i - 15] >> 3);
+            uint32_t s1 = ROR(w[i - 2], 17) ^ ROR(w[i - 2], 19) ^ (w[i - 2] >> 10);
+            w[i] = w[i - 16] + s0 + w[i - 7] + s1;
+        }
+        for (i = 0; i < 64; i++) {
+            uint32_t S1 = ROR(e, 6) ^ ROR(e, 11) ^ ROR(e, 25);
+            uint32_t ch = (e & f) ^ (~e & g);
+            uint32_t t1 = h + S1 + ch + K256[i] + w[i];
+            uint32_t S0 = ROR(a, 2) ^ ROR(a, 13) ^ ROR(a, 22);
+            uint32_t maj = (a & b) ^ (a & c) ^ (b & c);
+            uint32_t t2 = S0 + maj;
+            h = g; g = f; f = e; e = d + t1;
+            d = c; c = b; b = a; a = t1 + t2;
+        }
+        state[0] += a; state[1] += b; state[2] += c; state[3] += d;
+        state[4] += e; state[5] += f; state[6] += g; state[7] += h;
+        blocks += 64;
+    }
+}
+
+/* ------------------------------------------------------------------ */
+/* x86 SHA-NI compression                                              */
+/* ------------------------------------------------------------------ */
+
+#ifdef LIME_X86
+
+/* Four rounds on schedule register M, for rounds 4*g .. 4*g+3. */
+#define SHANI_RND4(M, g)                                                      \
+    do {                                                                      \
+        MSG = _mm_add_epi32((M), _mm_loadu_si128((const __m128i *)&K256[4 * (g)])); \
+        STATE1 = _mm_sha256rnds2_epu32(STATE1, STATE0, MSG);                  \
+        MSG = _mm_shuffle_epi32(MSG, 0x0E);                                   \
+        STATE0 = _mm_sha256rnds2_epu32(STATE0, STATE1, MSG);                  \
+    } while (0)
+
+/* Finish the next schedule register from the current and previous ones. */
+#define SHANI_MSG2(NEXT, CUR, PREV)                                           \
+    do {                                                                      \
+        (NEXT) = _mm_add_epi32((NEXT), _mm_alignr_epi8((CUR), (PREV), 4));    \
+        (NEXT) = _mm_sha256msg2_epu32((NEXT), (CUR));                         \
+    } while (0)
+
+#define SHANI_MSG1(PREV, CUR) ((PREV) = _mm_sha256msg1_epu32((PREV), (CUR)))
+
+LIME_TARGET_SHANI static void
+compress_shani(uint32_t state[8], const uint8_t *blocks, size_t nblocks)
+{
+    const __m128i MASK = _mm_set_epi64x(0x0c0d0e0f08090a0bULL, 0x0405060700010203ULL);
+    __m128i STATE0, STATE1, MSG, TMP;
+    __m128i M0, M1, M2, M3, ABEF_SAVE, CDGH_SAVE;
+
+    TMP = _mm_loadu_si128((const __m128i *)&state[0]);
+    STATE1 = _mm_loadu_si128((const __m128i *)&state[4]);
+    TMP = _mm_shuffle_epi32(TMP, 0xB1);          /* CDAB */
+    STATE1 = _mm_shuffle_epi32(STATE1, 0x1B);    /* EFGH */
+    STATE0 = _mm_alignr_epi8(TMP, STATE1, 8);    /* ABEF */
+    STATE1 = _mm_blend_epi16(STATE1, TMP, 0xF0); /* CDGH */
+
+    while (nblocks--) {
+        ABEF_SAVE = STATE0;
+        CDGH_SAVE = STATE1;
+
+        M0 = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(blocks + 0)), MASK);
+        M1 = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(blocks + 16)), MASK);
+        M2 = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(blocks + 32)), MASK);
+        M3 = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(blocks + 48)), MASK);
+
+        SHANI_RND4(M0, 0);
+        SHANI_RND4(M1, 1);  SHANI_MSG1(M0, M1);
+        SHANI_RND4(M2, 2);  SHANI_MSG1(M1, M2);
+        SHANI_RND4(M3, 3);  SHANI_MSG2(M0, M3, M2); SHANI_MSG1(M2, M3);
+        SHANI_RND4(M0, 4);  SHANI_MSG2(M1, M0, M3); SHANI_MSG1(M3, M0);
+        SHANI_RND4(M1, 5);  SHANI_MSG2(M2, M1, M0); SHANI_MSG1(M0, M1);
+        SHANI_RND4(M2, 6);  SHANI_MSG2(M3, M2, M1); SHANI_MSG1(M1, M2);
+        SHANI_RND4(M3, 7);  SHANI_MSG2(M0, M3, M2); SHANI_MSG1(M2, M3);
+        SHANI_RND4(M0, 8);  SHANI_MSG2(M1, M0, M3); SHANI_MSG1(M3, M0);
+        SHANI_RND4(M1, 9);  SHANI_MSG2(M2, M1, M0); SHANI_MSG1(M0, M1);
+        SHANI_RND4(M2, 10); SHANI_MSG2(M3, M2, M1); SHANI_MSG1(M1, M2);
+        SHANI_RND4(M3, 11); SHANI_MSG2(M0, M3, M2); SHANI_MSG1(M2, M3);
+        SHANI_RND4(M0, 12); SHANI_MSG2(M1, M0, M3); SHANI_MSG1(M3, M0);
+        SHANI_RND4(M1, 13); SHANI_MSG2(M2, M1, M0);
+        SHANI_RND4(M2, 14); SHANI_MSG2(M3, M2, M1);
+        SHANI_RND4(M3, 15);
+
+        STATE0 = _mm_add_epi32(STATE0, ABEF_SAVE);
+        STATE1 = _mm_add_epi32(STATE1, CDGH_SAVE);
+        blocks += 64;
+    }
+
+    TMP = _mm_shuffle_epi32(STATE0, 0x1B);       /* FEBA */
+    STATE1 = _mm_shuffle_epi32(STATE1, 0xB1);    /* DCHG */
+    STATE0 = _mm_blend_epi16(TMP, STATE1, 0xF0); /* DCBA */
+    STATE1 = _mm_alignr_epi8(STATE1, TMP, 8);    /* HGFE */
+    _mm_storeu_si128((__m128i *)&state[0], STATE0);
+    _mm_storeu_si128((__m128i *)&state[4], STATE1);
+}
+
+static int
+cpu_has_shani(void)
+{
+    unsigned int a, b, c, d;
+#if defined(_MSC_VER)
+    int r[4];
+    __cpuid(r, 0);
+    if (r[0] < 7)
+        return 0;
+    __cpuid(r, 1);
+    c = (unsigned int)r[2];
+    if (!(c & (1u << 9)) || !(c & (1u << 19)))    /* SSSE3, SSE4.1 */
+        return 0;
+    __cpuidex(r, 7, 0);
+    b = (unsigned int)r[1];
+    (void)a; (void)d;
+#else
+    if (__get_cpuid_max(0, NULL) < 7)
+        return 0;
+    __cpuid(1, a, b, c, d);
+    if (!(c & (1u << 9)) || !(c & (1u << 19)))    /* SSSE3, SSE4.1 */
+        return 0;
+    __cpuid_count(7, 0, a, b, c, d);
+#endif
+    return (b & (1u << 29)) != 0;                 /* SHA */
+}
+
+#endif /* LIME_X86 */
+
+/* ------------------------------------------------------------------ */
+/* ARMv8 SHA2 compression                                              */
+/* ------------------------------------------------------------------ */
+
+#ifdef LIME_ARM_SHA2
+
+#define ARM_RND4(M, g)                                                        \
+    do {                                                                      \
+        W = vaddq_u32((M), vld1q_u32(&K256[4 * (g)]));                        \
+        T = STATE0;                                                           \
+        STATE0 = vsha256hq_u32(STATE0, STATE1, W);                            \
+        STATE1 = vsha256h2q_u32(STATE1, T, W);                                \
+    } while (0)
+
+/* Replace M0 with the schedule words four groups ahead. */
+#define ARM_SCHED(M0, M1, M2, M3)                                             \
+    ((M0) = vsha256su1q_u32(vsha256su0q_u32((M0), (M1)), (M2), (M3)))
+
+static void
+compress_arm(uint32_t state[8], const uint8_t *blocks, size_t nblocks)
+{
+    uint32x4_t STATE0 = vld1q_u32(&state[0]);
+    uint32x4_t STATE1 = vld1q_u32(&state[4]);
+    uint32x4_t M0, M1, M2, M3, W, T, ABCD_SAVE, EFGH_SAVE;
+
+    while (nblocks--) {
+        ABCD_SAVE = STATE0;
+        EFGH_SAVE = STATE1;
+
+        M0 = vreinterpretq_u32_u8(vrev32q_u8(vld1q_u8(blocks + 0)));
+        M1 = vreinterpretq_u32_u8(vrev32q_u8(vld1q_u8(blocks + 16)));
+        M2 = vreinterpretq_u32_u8(vrev32q_u8(vld1q_u8(blocks + 32)));
+        M3 = vreinterpretq_u32_u8(vrev32q_u8(vld1q_u8(blocks + 48)));
+
+        ARM_RND4(M0, 0);  ARM_SCHED(M0, M1, M2, M3);
+        ARM_RND4(M1, 1);  ARM_SCHED(M1, M2, M3, M0);
+        ARM_RND4(M2, 2);  ARM_SCHED(M2, M3, M0, M1);
+        ARM_RND4(M3, 3);  ARM_SCHED(M3, M0, M1, M2);
+        ARM_RND4(M0, 4);  ARM_SCHED(M0, M1, M2, M3);
+        ARM_RND4(M1, 5);  ARM_SCHED(M1, M2, M3, M0);
+        ARM_RND4(M2, 6);  ARM_SCHED(M2, M3, M0, M1);
+        ARM_RND4(M3, 7);  ARM_SCHED(M3, M0, M1, M2);
+        ARM_RND4(M0, 8);  ARM_SCHED(M0, M1, M2, M3);
+        ARM_RND4(M1, 9);  ARM_SCHED(M1, M2, M3, M0);
+        ARM_RND4(M2, 10); ARM_SCHED(M2, M3, M0, M1);
+        ARM_RND4(M3, 11); ARM_SCHED(M3, M0, M1, M2);
+        ARM_RND4(M0, 12);
+        ARM_RND4(M1, 13);
+        ARM_RND4(M2, 14);
+        ARM_RND4(M3, 15);
+
+        STATE0 = vaddq_u32(STATE0, ABCD_SAVE);
+        STATE1 = vaddq_u32(STATE1, EFGH_SAVE);
+        blocks += 64;
+    }
+
+    vst1q_u32(&state[0], STATE0);
+    vst1q_u32(&state[4], STATE1);
+}
+
+#endif /* LIME_ARM_SHA2 */
+
+/* ------------------------------------------------------------------ */
+/* Search                                                              */
+/* ------------------------------------------------------------------ */
+
+static compress_fn compress = compress_generic;
+static const char *impl_name = "generic";
+
+static void
+store_be32(uint8_t *p, uint32_t v)
+{
+    p[0] = (uint8_t)(v >> 24); p[1] = (uint8_t)(v >> 16);
+    p[2] = (uint8_t)(v >> 8);  p[3] = (uint8_t)v;
+}
+
+static void
+store_be64(uint8_t *p, uint64_t v)
+{
+    store_be32(p, (uint32_t)(v >> 32));
+    store_be32(p + 4, (uint32_t)v);
+}
+
+/* True if the digest (as state words) has at least `bits` leading zero bits. */
+static int
+meets_difficulty(const uint32_t st[8], int bits)
+{
+    int i = 0;
+    for (; bits >= 32; bits -= 32, i++) {
+        if (st[i] != 0)
+            return 0;
+    }
+    return bits == 0 || (st[i] >> (32 - bits)) == 0;
+}
+
+/*
+ * Scan nonces [start, start + count) of SHA-256(prefix || nonce_be64).
+ * Returns 1 and fills nonce_out / digest_out on a hit.
+ */
+static int
+search_range(const uint8_t *prefix, size_t len, int difficulty,
+             uint64_t start, uint64_t count,
+             uint64_t *nonce_out, uint8_t digest_out[32])
+{
+    uint32_t mid[8], st[8];
+    uint8_t tail[128];
+    size_t full = len - (len % 64);
+    size_t rem = len - full;
+    size_t tail_len = rem + 8 + 1 + 8 <= 64 ? 64 : 128;
+    uint64_t n;
+    int i;
+
+    memcpy(mid, H256, sizeof(mid));
+    compress(mid, prefix, full / 64);
+
+    memset(tail, 0, sizeof(tail));
+    memcpy(tail, prefix + full, rem);
+    tail[rem + 8] = 0x80;
+    store_be64(tail + tail_len - 8, (uint64_t)(len + 8) * 8);
+
+    for (n = start; n - start < count; n++) {
+        store_be64(tail + rem, n);
+        memcpy(st, mid, sizeof(st));
+        compress(st, tail, tail_len / 64);
+        if (meets_difficulty(st, difficulty)) {
+            *nonce_out = n;
+            for (i = 0; i < 8; i++)
+                store_be32(digest_out + 4 * i, st[i]);
+            return 1;
+        }
+    }
+    return 0;
+}
+
+static PyObject *
+powmine_search(PyObject *self, PyObject *args)
+{
+    Py_buffer prefix;
+    int difficulty;
+    unsigned long long start, count;
+    uint64_t nonce = 0;
+    uint8_t digest[32];
+    int hit;
+
+    if (!PyArg_ParseTuple(args, "y*iKK:search", &prefix, &difficulty, &start, &count))
+        return NULL;
+    if (difficulty < 0 || difficulty > 256) {
+        PyBuffer_Release(&prefix);
+        PyErr_SetString(PyExc_ValueError, "difficulty must be between 0 and 256");
+        return NULL;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    hit = search_range((const uint8_t *)prefix.buf, (size_t)prefix.len, difficulty,
+                       (uint64_t)start, (uint64_t)count, &nonce, digest);
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&prefix);
+    if (!hit)
+        Py_RETURN_NONE;
+    return Py_BuildValue("(Ky#)", (unsigned long long)nonce, (const char *)digest, (Py_ssize_t)32);
+}
+
+/* SHA-256 of "abc" and of the 56-byte two-block FIPS 180-2 vector. */
+static int
+self_test(compress_fn fn)
+{
+    static const uint8_t expect_abc[32] = {
+        0xba, 0x78, 0x16, 0xbf, 0x8f, 0x01, 0xcf, 0xea, 0x41, 0x41, 0x40, 0xde, 0x5d, 0xae, 0x22, 0x23,
+        0xb0, 0x03, 0x61, 0xa3, 0x96, 0x17, 0x7a, 0x9c, 0xb4, 0x10, 0xff, 0x61, 0xf2, 0x00, 0x15, 0xad,
+    };
+    static const uint8_t expect_long[32] = {
+        0x24, 0x8d, 0x6a, 0x61, 0xd2, 0x06, 0x38, 0xb8, 0xe5, 0xc0, 0x26, 0x93, 0x0c, 0x3e, 0x60, 0x39,
+        0xa3, 0x3c, 0xe4, 0x59, 0x64, 0xff, 0x21, 0x67, 0xf6, 0xec, 0xed, 0xd4, 0x19, 0xdb, 0x06, 0xc1,
+    };
+    static const char long_msg[] = "abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq";
+    uint8_t buf[128];
+    uint32_t st[8];
+    int i;
+
+    memset(buf, 0, sizeof(buf));
+    memcpy(buf, "abc", 3);
+    buf[3] = 0x80;
+    buf[63] = 24;
+    memcpy(st, H256, sizeof(st));
+    fn(st, buf, 1);
+    for (i = 0; i < 8; i++) {
+        uint8_t w[4];
+        store_be32(w, st[i]);
+        if (memcmp(w, expect_abc + 4 * i, 4) != 0)
+            return 0;
+    }
+
+    memset(buf, 0, sizeof(buf));
+    memcpy(buf, long_msg, 56);
+    buf[56] = 0x80;
+    store_be64(buf + 120, 56 * 8);
+    memcpy(st, H256, sizeof(st));
+    fn(st, buf, 2);
+    for (i = 0; i < 8; i++) {
+        uint8_t w[4];
+        store_be32(w, st[i]);
+        if (memcmp(w, expect_long + 4 * i, 4) != 0)
+            return 0;
+    }
+    return 1;
+}
+
+static int
+select_impl(void)
+{
+#ifdef LIME_X86
+    if (cpu_has_shani() && self_test(compress_shani)) {
+        compress = compress_shani;
+        impl_name = "sha-ni";
+        return 1;
+    }
+#endif
+#ifdef LIME_ARM_SHA2
+    if (self_test(compress_arm)) {
+        compress = compress_arm;
+        impl_name = "armv8-sha2";
+        return 1;
+    }
+#endif
+    if (self_test(compress_generic)) {
+        compress = compress_generic;
+        impl_name = "generic";
+        return 1;
+    }
+    return 0;
+}
+
+static PyMethodDef powmine_methods[] = {
+    {"search", powmine_search, METH_VARARGS,
+     "search(prefix, difficulty, start, count) -> (nonce, digest) | None\n\n"
+     "Scan nonces [start, start + count) for SHA-256(prefix || nonce) with\n"
+     "`difficulty` leading zero bits. The nonce is appended as 8 big-endian bytes."},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef powmine_module = {
+    PyModuleDef_HEAD_INIT, "_powmine", NULL, -1, powmine_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__powmine(void)
+{
+    PyObject *m;
+    if (!select_impl()) {
+        PyErr_SetString(PyExc_ImportError, "_powmine: SHA-256 self-test failed");
+        return NULL;
+    }
+    m = PyModule_Create(&powmine_module);
+    if (m != NULL && PyModule_AddStringConstant(m, "IMPL", impl_name) < 0) {
+        Py_DECREF(m);
+        return NULL;
+    }
+    return m;
+}
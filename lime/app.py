@@ -1,7 +1,8 @@
 import argparse
 import asyncio
-import curses
-import json
+import atexit
+import concurrent.futures
+import multiprocessing
 import os
 import queue
 import shutil
@@ -10,6 +11,9 @@ import sys
 import threading
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import orjson
 
 from lime.config import (
     BOOTSTRAP_PEERS,
@@ -27,11 +31,11 @@ from lime.crypto import (
     save_identity,
     sign,
 )
-from lime.message import create_message
-from lime.network import Network
-from lime.store import MessageStore
-from lime.tui import LimeTUI
-from lime.wallet import generate_wallet, load_wallet, save_wallet, get_balance, HAS_WEB3
+
+# The network/TUI stack and web3 are imported where they are used so that
+# quick commands (peers, reset, upgrade, wallet...) start fast.
+if TYPE_CHECKING:
+    from lime.network import Network
 
 
 # ------------------------------------------------------------------
@@ -54,6 +58,51 @@ def _fail(msg: str):
 # Install limes to PATH
 # ------------------------------------------------------------------
 
+def _add_to_user_path_win(dir_str: str):
+    """Append dir_str to the user PATH in the registry, no subprocess needed."""
+    import ctypes
+    import winreg
+
+    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0,
+                        winreg.KEY_READ | winreg.KEY_WRITE) as key:
+        try:
+            user_path, kind = winreg.QueryValueEx(key, "Path")
+        except FileNotFoundError:
+            user_path, kind = "", winreg.REG_EXPAND_SZ
+        if dir_str.lower() in user_path.lower():
+            return
+        if kind not in (winreg.REG_SZ, winreg.REG_EXPAND_SZ):
+            kind = winreg.REG_EXPAND_SZ
+        new_path = (user_path.rstrip(";") + ";" + dir_str) if user_path else dir_str
+        winreg.SetValueEx(key, "Path", 0, kind, new_path)
+
+    # Tell Explorer (and so new terminals) that the environment changed.
+    HWND_BROADCAST, WM_SETTINGCHANGE, SMTO_ABORTIFHUNG = 0xFFFF, 0x001A, 0x0002
+    ctypes.windll.user32.SendMessageTimeoutW(
+        HWND_BROADCAST, WM_SETTINGCHANGE, 0, "Environment",
+        SMTO_ABORTIFHUNG, 5000, None,
+    )
+
+
+def _add_to_user_path_powershell(dir_str: str):
+    """Fallback for _add_to_user_path_win: one PowerShell read/check/write."""
+    dir_str = dir_str.replace("'", "''")
+    script = (
+        f"$d='{dir_str}';"
+        "$p=[Environment]::GetEnvironmentVariable('Path','User');"
+        "if($null -eq $p){$p=''};"
+        "if(-not $p.ToLower().Contains($d.ToLower())){"
+        "[Environment]::SetEnvironmentVariable('Path',$p.TrimEnd(';')+';'+$d,'User')}"
+    )
+    try:
+        subprocess.run(
+            ["powershell", "-NoProfile", "-NonInteractive", "-Command", script],
+            capture_output=True, timeout=10,
+        )
+    except Exception:
+        pass
+
+
 def _install_to_path():
     """Copy the running exe to a directory on PATH so 'limes' works globally."""
     if not getattr(sys, "frozen", False):
@@ -85,20 +134,10 @@ def _install_to_path():
             pass
 
     if platform == "win32":
-        dir_str = str(install_dir)
         try:
-            user_path = subprocess.run(
-                ["powershell", "-Command",
-                 "[Environment]::GetEnvironmentVariable('Path','User')"],
-                capture_output=True, text=True, timeout=10,
-            ).stdout.strip()
-            if dir_str.lower() not in user_path.lower():
-                new_path = user_path.rstrip(";") + ";" + dir_str
-                subprocess.run(
-                    ["powershell", "-Command",
-                     f"[Environment]::SetEnvironmentVariable('Path','{new_path}','User')"],
-                    capture_output=True, timeout=10,
-                )
+            _add_to_user_path_win(str(install_dir))
+        except ImportError:
+            _add_to_user_path_powershell(str(install_dir))
         except Exception:
             pass
     else:
@@ -129,6 +168,27 @@ def _parse_version(v: str) -> tuple[int, ...]:
     return tuple(int(x) for x in v.strip().split("."))
 
 
+class _ProgressWriter:
+    """File wrapper that prints download progress, at most once per 256 KiB."""
+
+    __slots__ = ("_f", "_total", "_done", "_next")
+
+    def __init__(self, f, total: int):
+        self._f = f
+        self._total = total
+        self._done = 0
+        self._next = 0
+
+    def write(self, b) -> int:
+        n = self._f.write(b)
+        self._done += len(b)
+        if self._total > 0 and (self._done >= self._next or self._done >= self._total):
+            self._next = self._done + (256 << 10)
+            pct = int(self._done / self._total * 100)
+            print(f"\r       downloading... {pct}%", end="", flush=True)
+        return n
+
+
 def _cmd_upgrade():
     import tempfile
     from urllib.request import urlopen, Request
@@ -191,17 +251,13 @@ def _cmd_upgrade():
         req = Request(exe_url, headers={"User-Agent": "lime-updater"})
         with urlopen(req, timeout=120) as resp:
             total = int(resp.headers.get("Content-Length", 0))
-            downloaded = 0
             with os.fdopen(tmp_fd, "wb") as f:
-                while True:
-                    chunk = resp.read(65536)
-                    if not chunk:
-                        break
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total > 0:
-                        pct = int(downloaded / total * 100)
-                        print(f"\r       downloading... {pct}%", end="", flush=True)
+                if hasattr(os, "posix_fadvise"):
+                    try:
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    except OSError:
+                        pass
+                shutil.copyfileobj(resp, _ProgressWriter(f, total), 1 << 20)
             print()
     except (URLError, OSError) as exc:
         _fail(f"download failed: {exc}")
@@ -239,30 +295,25 @@ del "%~f0" > nul 2>&1
 def _ensure_firewall_rule():
     """Add a Windows Firewall rule to allow limes TCP traffic."""
     rule_name = "limes P2P"
+    add = (
+        f'netsh advfirewall firewall add rule name="{rule_name}" dir=%s action=allow '
+        f'protocol=TCP localport={TCP_PORT_DEFAULT} profile=any >nul'
+    )
+    # show/add/add in a single cmd.exe call; the echo tells us which branch ran.
+    script = (
+        f'netsh advfirewall firewall show rule name="{rule_name}" >nul 2>&1'
+        f' && echo exists || ({add % "in"} & {add % "out"} & echo added)'
+    )
     try:
-        check = subprocess.run(
-            ["netsh", "advfirewall", "firewall", "show", "rule", f"name={rule_name}"],
-            capture_output=True, text=True, timeout=10,
+        result = subprocess.run(
+            script, shell=True, capture_output=True, text=True, timeout=20,
         )
-        if check.returncode == 0 and rule_name in check.stdout:
-            _ok("firewall rule exists.")
-            return
     except Exception:
-        pass
-
-    _ok("adding firewall rule for limes...")
-    for direction in ("in", "out"):
-        try:
-            subprocess.run(
-                ["netsh", "advfirewall", "firewall", "add", "rule",
-                 f"name={rule_name}", f"dir={direction}", "action=allow",
-                 "protocol=TCP", f"localport={TCP_PORT_DEFAULT}",
-                 "profile=any"],
-                capture_output=True, timeout=10,
-            )
-        except Exception:
-            pass
-    _ok("firewall configured.")
+        return
+    if "exists" in result.stdout:
+        _ok("firewall rule exists.")
+    else:
+        _ok("firewall configured.")
 
 
 # ------------------------------------------------------------------
@@ -295,6 +346,7 @@ def _cmd_setup(then_open: bool = False):
 
     # -- 2. Wallet --
     _step(2, total, "setting up wallet...")
+    from lime.wallet import HAS_WEB3, generate_wallet, load_wallet, save_wallet
     w = load_wallet()
     if w:
         _ok(f"wallet: {w[0]}")
@@ -357,22 +409,76 @@ def _setup_identity():
 # Saved peers
 # ------------------------------------------------------------------
 
-def _load_peers() -> list[list]:
+def _read_peers_file() -> list[list]:
     if PEERS_FILE.exists():
         try:
-            return json.loads(PEERS_FILE.read_text())
+            return orjson.loads(PEERS_FILE.read_bytes())
         except Exception:
             return []
     return []
 
 
+def _load_peers() -> list[list]:
+    with _peers_lock:
+        if _peers is not None:
+            return list(_peers)
+    return _read_peers_file()
+
+
+# Saved peers are kept in memory and written by a background thread so a
+# connect never waits on the disk; the writer only persists the newest snapshot.
+_peers_lock = threading.Lock()
+_peers: list[list] | None = None
+_peers_seen: set[tuple] = set()
+_peers_write_q: queue.Queue = queue.Queue()
+_peers_writer: threading.Thread | None = None
+
+
+def _peers_writer_loop():
+    while True:
+        peers = _peers_write_q.get()
+        stop = peers is None
+        try:
+            while True:
+                nxt = _peers_write_q.get_nowait()
+                if nxt is None:
+                    stop = True
+                else:
+                    peers = nxt
+        except queue.Empty:
+            pass
+        if peers is not None:
+            try:
+                LIME_DIR.mkdir(parents=True, exist_ok=True)
+                PEERS_FILE.write_bytes(orjson.dumps(peers, option=orjson.OPT_INDENT_2))
+            except Exception:
+                pass
+        if stop:
+            return
+
+
+def _flush_peers():
+    if _peers_writer is not None:
+        _peers_write_q.put(None)
+        _peers_writer.join(timeout=2)
+
+
 def _save_peer(host: str, port: int):
-    peers = _load_peers()
-    entry = [host, port]
-    if entry not in peers:
-        peers.append(entry)
-        LIME_DIR.mkdir(parents=True, exist_ok=True)
-        PEERS_FILE.write_text(json.dumps(peers, indent=2))
+    global _peers, _peers_writer
+    with _peers_lock:
+        if _peers is None:
+            _peers = _read_peers_file()
+            _peers_seen.update(tuple(p) for p in _peers)
+        entry = (host, port)
+        if entry in _peers_seen:
+            return
+        _peers_seen.add(entry)
+        _peers.append([host, port])
+        if _peers_writer is None:
+            _peers_writer = threading.Thread(target=_peers_writer_loop, daemon=True)
+            _peers_writer.start()
+            atexit.register(_flush_peers)
+        _peers_write_q.put(list(_peers))
 
 
 # ------------------------------------------------------------------
@@ -380,14 +486,35 @@ def _save_peer(host: str, port: int):
 # ------------------------------------------------------------------
 
 _net_loop: asyncio.AbstractEventLoop | None = None
+_outbox: asyncio.Queue | None = None    # mined messages waiting for broadcast
+
+_OUTBOX_BATCH = 64
+
+
+async def _broadcaster(network: "Network", outbox: asyncio.Queue, ui_queue):
+    """Drain the outbox, broadcasting whatever has piled up as one batch."""
+    while True:
+        msgs = [await outbox.get()]
+        while len(msgs) < _OUTBOX_BATCH and not outbox.empty():
+            msgs.append(outbox.get_nowait())
+        try:
+            await network.broadcast_many(msgs)
+        except Exception:
+            pass
+        for msg in msgs:
+            ui_queue.put(("msg_sent", msg))
 
 
-def _network_main(network: Network, saved_peers: list, connect_addr):
+def _network_main(network: "Network", saved_peers: list, connect_addr):
     global _net_loop
-    _net_loop = asyncio.new_event_loop()
+    from lime.network import new_event_loop
+    _net_loop = new_event_loop()
     asyncio.set_event_loop(_net_loop)
 
     async def _run():
+        global _outbox
+        _outbox = asyncio.Queue(maxsize=256)
+        asyncio.create_task(_broadcaster(network, _outbox, network.ui_queue))
         await network.start()
         await asyncio.sleep(0.5)
 
@@ -410,26 +537,48 @@ def _network_main(network: Network, saved_peers: list, connect_addr):
 # Callbacks from TUI -> network
 # ------------------------------------------------------------------
 
+_pow_pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+
+def _get_pow_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Process pool for PoW so mining never contends with the network loop's GIL."""
+    global _pow_pool
+    if _pow_pool is None:
+        _pow_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 1) - 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pow_pool
+
+
+async def _mine_and_sign(msg, sk):
+    """Mine msg's PoW in the pool, then sign it back on the loop thread."""
+    from lime.message import mine_pow, seal_message
+    loop = asyncio.get_running_loop()
+    nonce, pow_hash = await loop.run_in_executor(
+        _get_pow_pool(), mine_pow, msg.pow_payload(),
+    )
+    return seal_message(msg, nonce, pow_hash, lambda data: sign(sk, data))
+
+
 def _make_send_cb(network, store, name, tag, pubkey_hex, sk, ui_queue):
+    from lime.message import new_message
+
     def send(content: str, content_type: str, board: str = "general",
              thread_id: str = "", thread_title: str = "", reply_to: str = "",
              file_name: str = "", file_data: str = "", file_size: int = 0):
         async def _do():
-            loop = asyncio.get_event_loop()
-            msg = await loop.run_in_executor(
-                None,
-                lambda: create_message(
-                    content, content_type, name, tag, pubkey_hex,
-                    store.last_hash, lambda data: sign(sk, data),
-                    board=board, thread_id=thread_id,
-                    thread_title=thread_title, reply_to=reply_to,
-                    file_name=file_name, file_data=file_data,
-                    file_size=file_size,
-                ),
-            )
+            msg = await _mine_and_sign(new_message(
+                content, content_type, name, tag, pubkey_hex,
+                store.last_hash,
+                board=board, thread_id=thread_id,
+                thread_title=thread_title, reply_to=reply_to,
+                file_name=file_name, file_data=file_data,
+                file_size=file_size,
+            ), sk)
             store.add(msg)
-            await network.broadcast(msg)
-            ui_queue.put(("msg_sent", msg))
+            if _outbox is not None:
+                await _outbox.put(msg)
 
         if _net_loop:
             asyncio.run_coroutine_threadsafe(_do(), _net_loop)
@@ -438,17 +587,15 @@ def _make_send_cb(network, store, name, tag, pubkey_hex, sk, ui_queue):
 
 
 def _make_dm_cb(network, store, name, tag, pubkey_hex, sk, ui_queue):
+    from lime.message import new_message
+
     def send_dm(content: str, target_name: str):
         async def _do():
-            loop = asyncio.get_event_loop()
-            msg = await loop.run_in_executor(
-                None,
-                lambda: create_message(
-                    content, "text", name, tag, pubkey_hex,
-                    store.last_hash, lambda data: sign(sk, data),
-                    board=target_name,
-                ),
-            )
+            msg = await _mine_and_sign(new_message(
+                content, "text", name, tag, pubkey_hex,
+                store.last_hash,
+                board=target_name,
+            ), sk)
             store.add_dm(msg)
             ui_queue.put(("new_dm", msg))
             for sid, cpk in network._verified_peers.items():
@@ -474,10 +621,16 @@ def _make_connect_cb(network):
 # ------------------------------------------------------------------
 
 def _open_tui(args):
+    import curses
+
+    from lime.network import Network
+    from lime.store import MessageStore
+    from lime.tui import LimeTUI, WakeQueue
+
     name, sk, vk, tag = _setup_identity()
     pubkey_hex = vk.encode().hex()
 
-    ui_queue: queue.Queue = queue.Queue()
+    ui_queue: queue.Queue = queue.Queue() if sys.platform == "win32" else WakeQueue()
     store = MessageStore()
 
     network = Network(
@@ -520,6 +673,7 @@ def _open_tui(args):
 # ------------------------------------------------------------------
 
 def main():
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(
         prog="limes",
         description="limes \u2014 anonymous ephemeral broadcast network",
@@ -544,6 +698,7 @@ def main():
 
     if args.command == "relay":
         from lime.relay import main as relay_main
+        from lime.wallet import load_wallet
         relay_port = int(args.address) if args.address else 4210
         w = load_wallet()
         relay_wallet = w[0] if w else None
@@ -578,15 +733,21 @@ def main():
         return
 
     if args.command == "wallet":
+        from lime.wallet import format_lime, get_balance, get_stats, load_wallet
         w = load_wallet()
         if not w:
             print("No wallet. Run 'limes setup' first.")
             return
         addr, pk = w
         print(f"  address: {addr}")
-        bal = get_balance(addr)
+        stats = get_stats(addr)
+        bal = stats["balance"] if stats else get_balance(addr)  # RPCs without batch support
         if bal is not None:
-            print(f"  $LIME:   {bal:.2f}")
+            print(f"  $LIME:   {format_lime(bal)}")
+            if stats:
+                print(f"  supply:  {format_lime(stats['total_supply'])}")
+                if stats["relay_messages"]:
+                    print(f"  relayed: {stats['relay_messages']}")
         else:
             print("  $LIME:   contract not deployed yet")
         if args.export:
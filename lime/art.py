@@ -28,16 +28,37 @@ _CELL_COLOR = {
 _CELL_BOLD = {"G", "W"}
 
 
+def _row_runs(row: str) -> list[tuple[int, str, str]]:
+    """Split a grid row into (col, text, cell) runs of identical non-empty cells."""
+    runs = []
+    col = 0
+    while col < len(row):
+        cell = row[col]
+        end = col
+        while end < len(row) and row[end] == cell:
+            end += 1
+        if cell in _CELL_COLOR:
+            runs.append((col, BLOCK * (end - col), cell))
+        col = end
+    return runs
+
+
+_ROW_RUNS = [_row_runs(row) for row in LIME_GRID]
+
+# Cell -> curses attr; color_pair() needs an initialised screen, so fill lazily.
+_cell_attrs: dict[str, int] = {}
+
+
 def draw_lime(stdscr, start_y: int, start_x: int):
-    for row_idx, row in enumerate(LIME_GRID):
-        for col_idx, cell in enumerate(row):
-            pair = _CELL_COLOR.get(cell)
-            if pair is None:
-                continue
+    if not _cell_attrs:
+        for cell, pair in _CELL_COLOR.items():
             attr = curses.color_pair(pair)
             if cell in _CELL_BOLD:
                 attr |= curses.A_BOLD
+            _cell_attrs[cell] = attr
+    for row_idx, runs in enumerate(_ROW_RUNS):
+        for col_idx, text, cell in runs:
             try:
-                stdscr.addstr(start_y + row_idx, start_x + col_idx * 2, BLOCK, attr)
+                stdscr.addstr(start_y + row_idx, start_x + col_idx * 2, text, _cell_attrs[cell])
             except curses.error:
                 pass
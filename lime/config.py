@@ -43,3 +43,4 @@ CHAIN_ID = 8453
 LIME_CONTRACT = ""   # Clanker-deployed $LIME ERC-20 address
 VAULT_CONTRACT = ""  # LimesVault staking/rewards contract address
 REGISTRY_CONTRACT = ""  # LimesRegistry relay registry contract address
+MULTICALL3_CONTRACT = "0xcA11bde05977b3631167028862bE2a173976CA11"  # same address on every chain
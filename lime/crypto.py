@@ -1,5 +1,6 @@
-import json
+import functools
 
+import orjson
 from nacl.encoding import HexEncoder
 from nacl.signing import SigningKey, VerifyKey
 
@@ -13,7 +14,7 @@ def generate_keypair() -> tuple[SigningKey, VerifyKey]:
 
 def pubkey_tag(verify_key: VerifyKey) -> str:
     """First 4 hex chars of the public key — used as a short visual tag."""
-    return verify_key.encode().hex()[:4]
+    return verify_key.encode()[:2].hex()
 
 
 def save_identity(name: str, signing_key: SigningKey):
@@ -22,7 +23,8 @@ def save_identity(name: str, signing_key: SigningKey):
         "name": name,
         "signing_key_hex": signing_key.encode(encoder=HexEncoder).decode(),
     }
-    IDENTITY_FILE.write_text(json.dumps(data, indent=2))
+    IDENTITY_FILE.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    _identity_cache.clear()
     try:
         import os, stat
         os.chmod(IDENTITY_FILE, stat.S_IRUSR | stat.S_IWUSR)
@@ -30,24 +32,41 @@ def save_identity(name: str, signing_key: SigningKey):
         pass
 
 
+# (mtime_ns, (name, signing_key)) of the last successful load_identity().
+_identity_cache: dict = {}
+
+
 def load_identity() -> tuple[str, SigningKey] | None:
-    if not IDENTITY_FILE.exists():
+    try:
+        mtime = IDENTITY_FILE.stat().st_mtime_ns
+    except OSError:
         return None
+    cached = _identity_cache.get("identity")
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
     try:
-        data = json.loads(IDENTITY_FILE.read_text())
+        data = orjson.loads(IDENTITY_FILE.read_bytes())
         sk = SigningKey(data["signing_key_hex"], encoder=HexEncoder)
-        return data["name"], sk
+        identity = data["name"], sk
     except Exception:
         return None
+    _identity_cache["identity"] = (mtime, identity)
+    return identity
 
 
 def sign(signing_key: SigningKey, data: bytes) -> bytes:
     return signing_key.sign(data).signature
 
 
+@functools.lru_cache(maxsize=1024)
+def _verify_key(pubkey_hex: str) -> VerifyKey:
+    """Decoded VerifyKey per author; the same few keys sign most messages."""
+    return VerifyKey(bytes.fromhex(pubkey_hex))
+
+
 def verify(pubkey_hex: str, signature_hex: str, data: bytes) -> bool:
     try:
-        vk = VerifyKey(bytes.fromhex(pubkey_hex))
+        vk = _verify_key(pubkey_hex)
         vk.verify(data, bytes.fromhex(signature_hex))
         return True
     except Exception:
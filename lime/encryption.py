@@ -12,6 +12,8 @@ the relay cannot decrypt.
 """
 
 import base64
+import binascii
+import functools
 
 from nacl.public import SealedBox, PublicKey as CurvePublicKey
 from nacl.secret import SecretBox
@@ -27,8 +29,12 @@ def sign_curve_pk(signing_key: SigningKey, curve_pk_hex: str) -> str:
     return sig.hex()
 
 
+@functools.lru_cache(maxsize=1024)
 def verify_curve_pk_sig(verify_key_hex: str, curve_pk_hex: str, sig_hex: str) -> bool:
-    """Verify that a curve public key was signed by the claimed identity."""
+    """Verify that a curve public key was signed by the claimed identity.
+
+    Cached: relays repeat the same peer list on every join/leave.
+    """
     try:
         vk = VerifyKey(bytes.fromhex(verify_key_hex))
         vk.verify(bytes.fromhex(curve_pk_hex), bytes.fromhex(sig_hex))
@@ -49,6 +55,7 @@ def verify_to_curve_public(verify_key: VerifyKey):
     return verify_key.to_curve25519_public_key()
 
 
+@functools.lru_cache(maxsize=1024)
 def curve_public_from_hex(hex_str: str) -> CurvePublicKey:
     return CurvePublicKey(bytes.fromhex(hex_str))
 
@@ -59,17 +66,33 @@ def seal_room_key(room_key: bytes, recipient_curve_public) -> str:
     return base64.b64encode(sealed).decode()
 
 
+@functools.lru_cache(maxsize=1024)
+def seal_room_key_for(room_key: bytes, curve_pk_hex: str) -> str:
+    """seal_room_key for a hex peer key, memoized per (room key, peer).
+
+    Re-sending the same sealed box to a reconnecting peer reveals nothing
+    new; a rotated room key misses the cache on its own.
+    """
+    return seal_room_key(room_key, curve_public_from_hex(curve_pk_hex))
+
+
 def unseal_room_key(sealed_b64: str, my_curve_private) -> bytes:
     """Decrypt room key using our X25519 private key."""
     sealed = base64.b64decode(sealed_b64)
     return SealedBox(my_curve_private).decrypt(sealed)
 
 
+@functools.lru_cache(maxsize=64)
+def _box(room_key: bytes) -> SecretBox:
+    """One SecretBox per room key, reused across messages."""
+    return SecretBox(room_key)
+
+
 def encrypt_message(plaintext: bytes, room_key: bytes) -> str:
     """Encrypt message bytes with the room key. Returns base64."""
-    return base64.b64encode(SecretBox(room_key).encrypt(plaintext)).decode()
+    return binascii.b2a_base64(_box(room_key).encrypt(plaintext), newline=False).decode("ascii")
 
 
 def decrypt_message(ciphertext_b64: str, room_key: bytes) -> bytes:
     """Decrypt a base64 envelope back to plaintext bytes."""
-    return SecretBox(room_key).decrypt(base64.b64decode(ciphertext_b64))
+    return _box(room_key).decrypt(binascii.a2b_base64(ciphertext_b64))
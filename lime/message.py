@@ -1,13 +1,20 @@
+import bisect
 import hashlib
 import json
+import math
+import operator
+import os
+import secrets
+import threading
 import time
-import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import orjson
 
 from lime.config import MAX_MESSAGE_LENGTH, MESSAGE_TTL, POW_DIFFICULTY
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     id: str
     prev_hash: str
@@ -29,10 +36,18 @@ class Message:
     file_data: str = ""     # base64
     file_size: int = 0
 
+    @property
+    def expires_at(self) -> float:
+        return self.timestamp + self.ttl
+
     @property
     def is_expired(self) -> bool:
         return time.time() > self.timestamp + self.ttl
 
+    @property
+    def has_finite_times(self) -> bool:
+        return finite_times(self.timestamp, self.ttl)
+
     @property
     def remaining_seconds(self) -> int:
         return max(0, int((self.timestamp + self.ttl) - time.time()))
@@ -46,43 +61,38 @@ class Message:
     def display_author(self) -> str:
         return f"{self.author_name}#{self.author_tag}"
 
+    # Cached "key": value fragments of the PoW fields in key order, and their join.
+    _pow_fields: list = field(default=None, init=False, repr=False, compare=False)
+    _pow_bytes: bytes = field(default=None, init=False, repr=False, compare=False)
+    # Encoded forms shared by every peer/relay a message fans out to.
+    _json_bytes: bytes = field(default=None, init=False, repr=False, compare=False)
+    _wire: bytes = field(default=None, init=False, repr=False, compare=False)
+    _relay_env: tuple = field(default=None, init=False, repr=False, compare=False)
+
+    def _canonical_fields(self) -> list[str]:
+        """The PoW fields as sorted '"key": value' fragments, serialized once."""
+        if self._pow_fields is None:
+            self._pow_fields = [
+                prefix + _json_value(v)
+                for prefix, v in zip(_POW_PREFIXES, _pow_values(self))
+            ]
+        return self._pow_fields
+
     def pow_payload(self) -> bytes:
         """Canonical bytes fed into the PoW miner (excludes nonce, pow_hash, sig)."""
-        return json.dumps({
-            "id": self.id,
-            "prev_hash": self.prev_hash,
-            "author_name": self.author_name,
-            "author_tag": self.author_tag,
-            "author_pubkey": self.author_pubkey,
-            "content": self.content,
-            "content_type": self.content_type,
-            "timestamp": self.timestamp,
-            "ttl": self.ttl,
-            "board": self.board,
-            "thread_id": self.thread_id,
-            "thread_title": self.thread_title,
-            "reply_to": self.reply_to,
-        }, sort_keys=True).encode()
+        if self._pow_bytes is None:
+            self._pow_bytes = _join_fields(self._canonical_fields())
+        return self._pow_bytes
 
     def signable_payload(self) -> bytes:
         """Canonical bytes that get signed (everything except the signature)."""
-        return json.dumps({
-            "id": self.id,
-            "prev_hash": self.prev_hash,
-            "author_name": self.author_name,
-            "author_tag": self.author_tag,
-            "author_pubkey": self.author_pubkey,
-            "content": self.content,
-            "content_type": self.content_type,
-            "timestamp": self.timestamp,
-            "ttl": self.ttl,
-            "nonce": self.nonce,
-            "pow_hash": self.pow_hash,
-            "board": self.board,
-            "thread_id": self.thread_id,
-            "thread_title": self.thread_title,
-            "reply_to": self.reply_to,
-        }, sort_keys=True).encode()
+        fields = self._canonical_fields()
+        return _join_fields([
+            *fields[:_SIG_SPLICE],
+            '"nonce": ' + _json_value(self.nonce),
+            '"pow_hash": ' + _json_value(self.pow_hash),
+            *fields[_SIG_SPLICE:],
+        ])
 
     def to_dict(self) -> dict:
         d = {
@@ -110,7 +120,22 @@ class Message:
         return d
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict())
+        return self.json_bytes().decode()
+
+    def json_bytes(self) -> bytes:
+        """to_dict() as JSON bytes, encoded once per message."""
+        if self._json_bytes is None:
+            try:
+                self._json_bytes = orjson.dumps(self.to_dict())
+            except TypeError:       # e.g. a >64-bit int from a peer
+                self._json_bytes = json.dumps(self.to_dict()).encode()
+        return self._json_bytes
+
+    def wire_bytes(self) -> bytes:
+        """Body of the {"type": "msg", "data": ...} peer frame, encoded once."""
+        if self._wire is None:
+            self._wire = b'{"type":"msg","data":' + self.json_bytes() + b"}"
+        return self._wire
 
     @classmethod
     def from_dict(cls, d: dict) -> "Message":
@@ -138,46 +163,151 @@ class Message:
 
     @classmethod
     def from_json(cls, s: str) -> "Message":
-        return cls.from_dict(json.loads(s))
+        return cls.from_dict(orjson.loads(s))
+
+
+# Canonical payloads must match json.dumps(..., sort_keys=True) byte for byte
+# (default separators, ASCII escaping), since that is what every peer hashes
+# and signs. They are emitted directly from precomputed key fragments.
+
+# Fields covered by the PoW, sorted; the signature additionally covers
+# nonce and pow_hash, which sort in right after "id".
+_POW_KEYS = tuple(sorted((
+    "id", "prev_hash", "author_name", "author_tag", "author_pubkey", "content",
+    "content_type", "timestamp", "ttl", "board", "thread_id", "thread_title",
+    "reply_to",
+)))
+_POW_PREFIXES = tuple(f'"{k}": ' for k in _POW_KEYS)
+_pow_values = operator.attrgetter(*_POW_KEYS)
+_SIG_SPLICE = bisect.bisect(_POW_KEYS, "nonce")
+
+_encode_str = json.encoder.encode_basestring_ascii
+_INF = float("inf")
+
+
+def _json_value(v) -> str:
+    """json.dumps(v) for the field types a message carries, minus the dispatch."""
+    t = type(v)
+    if t is str:
+        return _encode_str(v)
+    if t is int or (t is float and v == v and v != _INF and v != -_INF):
+        return repr(v)
+    return json.dumps(v, sort_keys=True)
+
+
+def finite_times(timestamp, ttl) -> bool:
+    """Whether a peer's timestamp and ttl are real numbers; NaN/inf never expire."""
+    for v in (timestamp, ttl):
+        t = type(v)
+        if not (t is int or (t is float and math.isfinite(v))):
+            return False
+    return True
+
+
+def _join_fields(fields: list[str]) -> bytes:
+    return ("{" + ", ".join(fields) + "}").encode()
 
 
 # ---------------------------------------------------------------------------
 # Proof of Work
 # ---------------------------------------------------------------------------
 
+try:
+    from lime import _powmine
+except ImportError:
+    _powmine = None
+
+if _powmine is None:
+    try:
+        from lime import _pow_numba
+    except ImportError:
+        _pow_numba = None
+else:
+    _pow_numba = None
+
+_NATIVE_CHUNK = 1 << 16     # nonces per native search() call
+
+
+def _mine_native(payload: bytes, difficulty: int) -> tuple[str, str]:
+    """Run the C search over disjoint nonce ranges, one thread per CPU."""
+    workers = os.cpu_count() or 1
+    found: list[tuple[int, bytes]] = []
+    done = threading.Event()
+
+    def worker(i: int):
+        start = i * _NATIVE_CHUNK
+        while not done.is_set():
+            hit = _powmine.search(payload, difficulty, start, _NATIVE_CHUNK)
+            if hit is not None:
+                found.append(hit)
+                done.set()
+                return
+            start += workers * _NATIVE_CHUNK
+
+    if workers == 1:
+        worker(0)
+    else:
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+                   for i in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    nonce, digest = found[0]
+    return nonce.to_bytes(8, "big").hex(), digest.hex()
+
+
 def mine_pow(payload: bytes, difficulty: int = POW_DIFFICULTY) -> tuple[str, str]:
     """Hashcash-style PoW: find nonce where SHA-256(payload||nonce) < target."""
-    target = 1 << (256 - difficulty)
+    if _powmine is not None:
+        return _mine_native(payload, difficulty)
+    if _pow_numba is not None:
+        return _pow_numba.mine(payload, difficulty)
+
+    # Hash the fixed payload once; each nonce only copies the midstate.
+    base = hashlib.sha256(payload)
+    copy = base.copy
+    # Leading-zero check on bytes: no bignum per attempt.
+    zero_bytes, rem_bits = divmod(difficulty, 8)
+    zero_prefix = bytes(zero_bytes)
+    limit = 1 << (8 - rem_bits)
     n = 0
     while True:
         nonce = n.to_bytes(8, "big")
-        h = hashlib.sha256(payload + nonce).digest()
-        if int.from_bytes(h, "big") < target:
-            return nonce.hex(), h.hex()
+        h = copy()
+        h.update(nonce)
+        d = h.digest()
+        if d[:zero_bytes] == zero_prefix and (rem_bits == 0 or d[zero_bytes] < limit):
+            return nonce.hex(), d.hex()
         n += 1
 
 
 def verify_pow(payload: bytes, nonce_hex: str, pow_hash_hex: str,
                difficulty: int = POW_DIFFICULTY) -> bool:
-    nonce = bytes.fromhex(nonce_hex)
-    h = hashlib.sha256(payload + nonce).digest()
-    if h.hex() != pow_hash_hex:
+    h = hashlib.sha256(payload)
+    h.update(bytes.fromhex(nonce_hex))  # no payload+nonce copy
+    d = h.digest()
+    if d.hex() != pow_hash_hex:
+        return False
+    # Same leading-zero test as the miner: no 256-bit int per check.
+    zero_bytes, rem_bits = divmod(difficulty, 8)
+    if d[:zero_bytes] != bytes(zero_bytes):
         return False
-    return int.from_bytes(h, "big") < (1 << (256 - difficulty))
+    return rem_bits == 0 or d[zero_bytes] < (1 << (8 - rem_bits))
 
 
 # ---------------------------------------------------------------------------
 # Message factory
 # ---------------------------------------------------------------------------
 
-def create_message(
+def new_message(
     content: str,
     content_type: str,
     author_name: str,
     author_tag: str,
     author_pubkey_hex: str,
     prev_hash: str,
-    sign_fn,                # (bytes) -> bytes
     *,
     board: str = "general",
     thread_id: str = "",
@@ -187,11 +317,12 @@ def create_message(
     file_data: str = "",
     file_size: int = 0,
 ) -> Message:
+    """Build an unmined, unsigned message; see seal_message."""
     if content_type != "file" and len(content) > MAX_MESSAGE_LENGTH:
         raise ValueError(f"Message too long ({len(content)} > {MAX_MESSAGE_LENGTH})")
 
     msg = Message(
-        id=str(uuid.uuid4()),
+        id=secrets.token_hex(16),
         prev_hash=prev_hash,
         author_name=author_name,
         author_tag=author_tag,
@@ -212,9 +343,39 @@ def create_message(
         file_size=file_size,
     )
 
-    msg.nonce, msg.pow_hash = mine_pow(msg.pow_payload())
+    return msg
 
+
+def seal_message(msg: Message, nonce: str, pow_hash: str, sign_fn) -> Message:
+    """Attach a mined PoW to an unsealed message and sign it."""
+    msg.nonce, msg.pow_hash = nonce, pow_hash
     sig_bytes = sign_fn(msg.signable_payload())
     msg.signature = sig_bytes.hex()
-
     return msg
+
+
+def create_message(
+    content: str,
+    content_type: str,
+    author_name: str,
+    author_tag: str,
+    author_pubkey_hex: str,
+    prev_hash: str,
+    sign_fn,                # (bytes) -> bytes
+    *,
+    board: str = "general",
+    thread_id: str = "",
+    thread_title: str = "",
+    reply_to: str = "",
+    file_name: str = "",
+    file_data: str = "",
+    file_size: int = 0,
+) -> Message:
+    msg = new_message(
+        content, content_type, author_name, author_tag, author_pubkey_hex,
+        prev_hash, board=board, thread_id=thread_id,
+        thread_title=thread_title, reply_to=reply_to, file_name=file_name,
+        file_data=file_data, file_size=file_size,
+    )
+    nonce, pow_hash = mine_pow(msg.pow_payload())
+    return seal_message(msg, nonce, pow_hash, sign_fn)
@@ -1,11 +1,20 @@
 import asyncio
+import collections
+import concurrent.futures
+import functools
+import heapq
+import itertools
 import json
+import os
 import socket
+import struct
 import time
 import uuid
 from queue import Queue
 from typing import Optional
 
+import orjson
+
 from lime.config import (
     BOOTSTRAP_PEERS,
     HEARTBEAT_INTERVAL,
@@ -21,8 +30,7 @@ from lime.encryption import (
     generate_room_key,
     signing_to_curve_private,
     verify_to_curve_public,
-    curve_public_from_hex,
-    seal_room_key,
+    seal_room_key_for,
     unseal_room_key,
     encrypt_message,
     decrypt_message,
@@ -37,11 +45,127 @@ try:
 except ImportError:
     websockets = None
 
+try:
+    import uvloop
+except ImportError:     # not installed, or Windows (stdlib loop)
+    uvloop = None
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Event loop for running a Network: uvloop where available."""
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def _dumps(obj) -> bytes:
+    """orjson-encoded frame; stdlib json for what orjson refuses (e.g. >64-bit ints)."""
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        return json.dumps(obj).encode()
+
+
+def _loads(raw):
+    """orjson decode, retried with stdlib json for inputs only it accepts (NaN...)."""
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
+
+
+def _line(obj) -> bytes:
+    """One NDJSON line of the TCP peer protocol."""
+    return _dumps(obj) + b"\n"
+
+
+# After the NDJSON hello, peers that both advertise this switch to frames with
+# a 4-byte big-endian length prefix; older peers keep NDJSON.
+_FRAMING = "len32"
+MAX_FRAME_BYTES = 65536
+_SYNC_CHUNK_BYTES = 1 << 20     # drain between chunks of a store sync
+# Per-peer write buffer watermarks; fan-out only awaits drain() for peers
+# whose buffer is past half the high mark.
+_WRITE_HIGH = 256 * 1024
+_WRITE_LOW = 64 * 1024
+_DRAIN_ABOVE = _WRITE_HIGH // 2
+MAX_SEEN_IDS = 10_000
+_VERIFY_BATCH = 64              # messages per verification pool job
+
+
+# LAN discover datagram: magic, version, u16-length name and tag, raw 32-byte
+# pubkey, u16 TCP port. Older peers announce JSON, which is still accepted.
+_DISCOVER_MAGIC = 0xDC
+_DISCOVER_VERSION = 1
+
+
+def _pack_discover(name: str, tag: str, pubkey_hex: str, tcp_port: int) -> bytes:
+    name_b, tag_b = name.encode(), tag.encode()
+    return b"".join((
+        struct.pack(">BBH", _DISCOVER_MAGIC, _DISCOVER_VERSION, len(name_b)), name_b,
+        struct.pack(">H", len(tag_b)), tag_b,
+        bytes.fromhex(pubkey_hex),
+        struct.pack(">H", tcp_port),
+    ))
+
+
+def _unpack_discover(data: bytes) -> dict:
+    """A discover datagram as the dict the JSON form decodes to."""
+    if data[0] != _DISCOVER_MAGIC:
+        return _loads(data)
+    _, version, n = struct.unpack_from(">BBH", data)
+    if version != _DISCOVER_VERSION:
+        raise ValueError("unknown discover version")
+    off = 4
+    name = data[off:off + n].decode()
+    off += n
+    (n,) = struct.unpack_from(">H", data, off)
+    off += 2
+    tag = data[off:off + n].decode()
+    off += n
+    pubkey = data[off:off + 32]
+    (tcp_port,) = struct.unpack_from(">H", data, off + 32)
+    return {
+        "type": "discover", "name": name, "tag": tag,
+        "pubkey": pubkey.hex(), "tcp_port": tcp_port,
+    }
+
+
+def _frame(body: bytes, framed: bool) -> bytes:
+    """body as one frame: length-prefixed if negotiated, else an NDJSON line."""
+    if framed:
+        return len(body).to_bytes(4, "big") + body
+    return body + b"\n"
+
+
+def _frames(bodies: list[bytes]) -> dict[bool, bytes]:
+    """Concatenated frames for both framings, keyed by Peer.framed."""
+    return {framed: b"".join(_frame(b, framed) for b in bodies) for framed in (False, True)}
+
+
+def _verify_batch(items: list[tuple]) -> list[bool]:
+    """PoW then signature check for each queued message (runs in a worker).
+
+    hashlib and libsodium release the GIL, so workers check in parallel.
+    """
+    return [
+        verify_pow(pow_payload, nonce, pow_hash, POW_DIFFICULTY)
+        and verify(pubkey, signature, signable)
+        for pow_payload, nonce, pow_hash, pubkey, signature, signable in items
+    ]
+
+
+def _resolve_verified(futures: list[asyncio.Future], job: asyncio.Future):
+    results = None if job.cancelled() or job.exception() else job.result()
+    for i, fut in enumerate(futures):
+        if not fut.done():
+            fut.set_result(results[i] if results else False)
+
 
 class Peer:
-    __slots__ = ("name", "tag", "pubkey", "reader", "writer", "address", "last_seen")
+    __slots__ = ("name", "tag", "pubkey", "reader", "writer", "address", "last_seen", "framed")
 
-    def __init__(self, name, tag, pubkey, reader, writer, address):
+    def __init__(self, name, tag, pubkey, reader, writer, address, framed=False):
         self.name = name
         self.tag = tag
         self.pubkey = pubkey
@@ -49,6 +173,7 @@ class Peer:
         self.writer: asyncio.StreamWriter = writer
         self.address = address
         self.last_seen = time.time()
+        self.framed = framed
 
     @property
     def display(self):
@@ -58,6 +183,16 @@ class Peer:
         return time.time() - self.last_seen < PEER_TIMEOUT
 
 
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Feeds LAN multicast datagrams to Network._on_discover."""
+
+    def __init__(self, network: "Network"):
+        self.network = network
+
+    def datagram_received(self, data, addr):
+        self.network._on_discover(data, addr)
+
+
 class Network:
     def __init__(
         self,
@@ -78,19 +213,40 @@ class Network:
         self.tcp_port = tcp_port
 
         self.peers: dict[str, Peer] = {}
+        self._by_addr: dict[tuple, Peer] = {}   # (host, port) -> peer
         self.claimed_names: dict[str, str] = {}
         self.seen_ids: set[str] = set()
+        self._seen_order: collections.deque[str] = collections.deque()
+        # (deadline, seq, peer) min-heap; deadlines are re-checked lazily on pop.
+        self._expiry: list[tuple[float, int, Peer]] = []
+        self._expiry_seq = itertools.count()
+        self._verify_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="lime-verify",
+        )
+        self._verify_pending: list[tuple[tuple, asyncio.Future]] = []
         self._running = False
         self._server: Optional[asyncio.Server] = None
+        self._discovery: Optional[asyncio.DatagramTransport] = None
+        self._announce_payload = b""    # discover datagram, built once bound
+        self._sync_cache: dict[bool, tuple[int, list[bytes]]] = {}  # framed -> (store version, chunks)
 
         # Relay privacy layer
         self._relay_ws: dict[str, object] = {}
         self.relay_wallet: str | None = None
-        self._session_id = str(uuid.uuid4())
+        self._session_id = uuid.uuid4().hex
         self._curve_private = signing_to_curve_private(signing_key)
         self._curve_public = verify_to_curve_public(signing_key.verify_key)
         self._curve_pk_hex = self._curve_public.encode().hex()
         self._curve_pk_sig = sign_curve_pk(signing_key, self._curve_pk_hex)
+        # Relay control frames that only carry our fixed identity.
+        ident = {
+            "session": self._session_id,
+            "curve_pk": self._curve_pk_hex,
+            "curve_pk_sig": self._curve_pk_sig,
+            "verify_key": self.pubkey_hex,
+        }
+        self._relay_hello = _dumps({"type": "hello", **ident})
+        self._key_request = _dumps({"type": "key_request", **ident})
         self._room_key: bytes | None = None
         self._room_key_event = asyncio.Event()
         self._verified_peers: dict[str, str] = {}  # session -> curve_pk_hex
@@ -117,28 +273,35 @@ class Network:
             self.ui_queue.put(("error", "Could not bind TCP port"))
             return
 
+        self._announce_payload = _pack_discover(
+            self.name, self.tag, self.pubkey_hex, self.tcp_port,
+        )
+
         await self._server.start_serving()
         asyncio.create_task(self._multicast_listener())
         asyncio.create_task(self._multicast_announce())
         asyncio.create_task(self._heartbeat_loop())
         asyncio.create_task(self._prune_loop())
 
-        from lime.registry import get_relay_urls
-        for relay_url in get_relay_urls():
+        from lime.registry import get_relay_urls_async
+        for relay_url in await get_relay_urls_async():
             asyncio.create_task(self._relay_connect(relay_url))
 
         self.ui_queue.put(("status", f"listening on port {self.tcp_port}"))
 
     async def stop(self):
         self._running = False
+        self._verify_pool.shutdown(wait=False)
         if self._server:
             self._server.close()
+        if self._discovery:
+            self._discovery.close()
         for peer in list(self.peers.values()):
             try:
                 peer.writer.close()
             except Exception:
                 pass
-        for ws in self._relay_ws.values():
+        for ws in list(self._relay_ws.values()):
             try:
                 await ws.close()
             except Exception:
@@ -155,25 +318,20 @@ class Network:
 
         while self._running:
             try:
-                async with websockets.connect(url) as ws:
+                # Relay traffic is ciphertext: deflate would only cost CPU.
+                async with websockets.connect(url, max_size=2**20, compression=None) as ws:
                     self._relay_ws[url] = ws
                     self.ui_queue.put(("status", "relay connected"))
 
-                    hello = json.dumps({
-                        "type": "hello",
-                        "session": self._session_id,
-                        "curve_pk": self._curve_pk_hex,
-                        "curve_pk_sig": self._curve_pk_sig,
-                        "verify_key": self.pubkey_hex,
-                    })
-                    await ws.send(hello)
+                    await ws.send(self._relay_hello)
                     asyncio.create_task(self._request_sync(ws))
 
-                    async for raw in ws:
-                        if not self._running:
-                            break
+                    while self._running:
+                        # Raw bytes, text frames included: orjson validates
+                        # UTF-8 while parsing, so skip websockets' own pass.
+                        raw = await ws.recv(decode=False)
                         try:
-                            data = json.loads(raw)
+                            data = _loads(raw)
                         except json.JSONDecodeError:
                             continue
                         await self._relay_dispatch(data, ws)
@@ -200,13 +358,7 @@ class Network:
             if count > 0:
                 self.ui_queue.put(("status", f"relay: {count} peers online"))
             if peers and self._room_key is None:
-                await ws.send(json.dumps({
-                    "type": "key_request",
-                    "session": self._session_id,
-                    "curve_pk": self._curve_pk_hex,
-                    "curve_pk_sig": self._curve_pk_sig,
-                    "verify_key": self.pubkey_hex,
-                }))
+                await ws.send(self._key_request)
                 asyncio.create_task(self._key_timeout())
             elif not peers:
                 self._room_key = generate_room_key()
@@ -222,16 +374,7 @@ class Network:
             if peer_vk and peer_sig and verify_curve_pk_sig(peer_vk, peer_curve_pk, peer_sig):
                 self._verified_peers[peer_session] = peer_curve_pk
             if self._room_key and peer_curve_pk and peer_session in self._verified_peers:
-                try:
-                    recipient_pk = curve_public_from_hex(peer_curve_pk)
-                    sealed = seal_room_key(self._room_key, recipient_pk)
-                    await ws.send(json.dumps({
-                        "type": "key_share",
-                        "to": peer_session,
-                        "sealed": sealed,
-                    }))
-                except Exception:
-                    pass
+                await self._send_key_share(ws, peer_session, peer_curve_pk)
 
         elif t == "relay_leave":
             self.ui_queue.put(("peer_left", "a peer"))
@@ -254,28 +397,22 @@ class Network:
             if peer_vk and peer_sig and verify_curve_pk_sig(peer_vk, peer_curve_pk, peer_sig):
                 self._verified_peers[peer_session] = peer_curve_pk
             if self._room_key and peer_curve_pk and peer_session != self._session_id and peer_session in self._verified_peers:
-                try:
-                    recipient_pk = curve_public_from_hex(peer_curve_pk)
-                    sealed = seal_room_key(self._room_key, recipient_pk)
-                    await ws.send(json.dumps({
-                        "type": "key_share",
-                        "to": peer_session,
-                        "sealed": sealed,
-                    }))
-                except Exception:
-                    pass
+                await self._send_key_share(ws, peer_session, peer_curve_pk)
 
         elif t == "msg":
             if self._room_key:
                 try:
                     envelope = data.get("envelope", "")
                     plaintext = decrypt_message(envelope, self._room_key)
-                    msg_data = json.loads(plaintext)
+                    msg_data = _loads(plaintext)
                     if isinstance(msg_data, dict) and msg_data.get("type") == "sync_request":
                         await self._handle_sync_request(msg_data, ws)
                     elif isinstance(msg_data, dict) and msg_data.get("type") == "sync_response":
-                        for raw_msg in msg_data.get("messages", []):
-                            await self._handle_msg(raw_msg, from_peer=None)
+                        # Concurrently, so the whole backlog is verified as pool batches.
+                        await asyncio.gather(*(
+                            self._handle_msg(raw_msg, from_peer=None)
+                            for raw_msg in msg_data.get("messages", [])
+                        ))
                     else:
                         await self._handle_msg(msg_data, from_peer=None)
                 except Exception:
@@ -286,10 +423,9 @@ class Network:
                 try:
                     envelope = data.get("envelope", "")
                     plaintext = decrypt_message(envelope, self._room_key)
-                    msg_data = json.loads(plaintext)
+                    msg_data = _loads(plaintext)
                     msg = Message.from_dict(msg_data)
-                    if not msg.is_expired and msg.id not in self.seen_ids:
-                        self.seen_ids.add(msg.id)
+                    if msg.has_finite_times and not msg.is_expired and self._add_seen(msg.id):
                         self.store.add_dm(msg)
                         self.ui_queue.put(("new_dm", msg))
                 except Exception:
@@ -298,6 +434,13 @@ class Network:
         elif t == "relay_wallet":
             self.relay_wallet = data.get("address")
 
+    async def _send_key_share(self, ws, peer_session: str, peer_curve_pk: str):
+        try:
+            sealed = seal_room_key_for(self._room_key, peer_curve_pk)
+            await ws.send(_dumps({"type": "key_share", "to": peer_session, "sealed": sealed}))
+        except Exception:
+            pass
+
     async def _key_timeout(self):
         """Generate own room key if no one shares one within 10 seconds."""
         try:
@@ -313,10 +456,10 @@ class Network:
         await self._room_key_event.wait()
         all_msgs = self.store.get_all()
         since = all_msgs[-1].timestamp if all_msgs else 0.0
-        payload = json.dumps({"type": "sync_request", "since": since})
+        payload = _dumps({"type": "sync_request", "since": since})
         if self._room_key:
-            envelope = encrypt_message(payload.encode(), self._room_key)
-            await ws.send(json.dumps({"type": "msg", "envelope": envelope}))
+            envelope = encrypt_message(payload, self._room_key)
+            await ws.send(_dumps({"type": "msg", "envelope": envelope}))
 
     async def _handle_sync_request(self, data: dict, ws):
         """Respond with messages since the requested timestamp."""
@@ -324,11 +467,11 @@ class Network:
         msgs = [m.to_dict() for m in self.store.get_all() if m.timestamp > since]
         if not msgs:
             return
-        response = json.dumps({"type": "sync_response", "messages": msgs[-50:]})
+        response = _dumps({"type": "sync_response", "messages": msgs[-50:]})
         if self._room_key:
-            envelope = encrypt_message(response.encode(), self._room_key)
+            envelope = encrypt_message(response, self._room_key)
             try:
-                await ws.send(json.dumps({"type": "msg", "envelope": envelope}))
+                await ws.send(_dumps({"type": "msg", "envelope": envelope}))
             except Exception:
                 pass
 
@@ -336,9 +479,8 @@ class Network:
         """Encrypt and send a DM through relays, targeted to a specific session."""
         if self._room_key is None:
             return
-        plaintext = json.dumps(msg.to_dict()).encode()
-        envelope = encrypt_message(plaintext, self._room_key)
-        payload = json.dumps({"type": "dm", "to": target_session, "envelope": envelope})
+        envelope = encrypt_message(msg.json_bytes(), self._room_key)
+        payload = _dumps({"type": "dm", "to": target_session, "envelope": envelope})
         for url, ws in list(self._relay_ws.items()):
             try:
                 await ws.send(payload)
@@ -349,13 +491,19 @@ class Network:
         """Encrypt and send a message through all connected relays."""
         if self._room_key is None:
             return
-        plaintext = json.dumps(msg.to_dict()).encode()
-        envelope = encrypt_message(plaintext, self._room_key)
-        payload = json.dumps({"type": "msg", "envelope": envelope})
-        for url, ws in list(self._relay_ws.items()):
-            try:
-                await ws.send(payload)
-            except Exception:
+        cached = msg._relay_env
+        if cached is not None and cached[0] == self._room_key:
+            payload = cached[1]
+        else:
+            envelope = encrypt_message(msg.json_bytes(), self._room_key)
+            payload = _dumps({"type": "msg", "envelope": envelope})
+            msg._relay_env = (self._room_key, payload)
+        relays = list(self._relay_ws.items())
+        results = await asyncio.gather(
+            *(ws.send(payload) for _, ws in relays), return_exceptions=True,
+        )
+        for (url, _), result in zip(relays, results):
+            if isinstance(result, Exception):
                 self._relay_ws.pop(url, None)
 
     # ------------------------------------------------------------------
@@ -363,11 +511,8 @@ class Network:
     # ------------------------------------------------------------------
 
     async def connect_to(self, host: str, port: int):
-        for p in self.peers.values():
-            if p.pubkey == self.pubkey_hex:
-                return
-            if p.address and p.address[0] == host and p.address[1] == port:
-                return
+        if (host, port) in self._by_addr:
+            return
         try:
             reader, writer = await asyncio.open_connection(host, port)
         except Exception:
@@ -388,19 +533,20 @@ class Network:
     # ------------------------------------------------------------------
 
     async def _handshake(self, reader, writer, addr, outbound: bool):
-        hello = json.dumps({
+        hello = _line({
             "type": "hello",
             "name": self.name,
             "tag": self.tag,
             "pubkey": self.pubkey_hex,
             "tcp_port": self.tcp_port,
-        }) + "\n"
+            "framing": _FRAMING,
+        })
         try:
-            writer.write(hello.encode())
+            writer.write(hello)
             await writer.drain()
 
             raw = await asyncio.wait_for(reader.readline(), timeout=10)
-            data = json.loads(raw.decode().strip())
+            data = _loads(raw)
         except Exception:
             writer.close()
             return
@@ -413,6 +559,7 @@ class Network:
         peer_tag = data["tag"]
         peer_pubkey = data["pubkey"]
         peer_id = f"{peer_name}#{peer_tag}"
+        framed = data.get("framing") == _FRAMING
 
         if peer_pubkey == self.pubkey_hex:
             writer.close()
@@ -423,15 +570,18 @@ class Network:
             return
 
         if peer_name in self.claimed_names and self.claimed_names[peer_name] != peer_pubkey:
-            reject = json.dumps({"type": "name_taken", "name": peer_name}) + "\n"
-            writer.write(reject.encode())
+            writer.write(_frame(_dumps({"type": "name_taken", "name": peer_name}), framed))
             await writer.drain()
             writer.close()
             return
 
         self.claimed_names[peer_name] = peer_pubkey
-        peer = Peer(peer_name, peer_tag, peer_pubkey, reader, writer, addr)
+        writer.transport.set_write_buffer_limits(high=_WRITE_HIGH, low=_WRITE_LOW)
+        peer = Peer(peer_name, peer_tag, peer_pubkey, reader, writer, addr, framed)
         self.peers[peer_id] = peer
+        if addr:
+            self._by_addr[tuple(addr[:2])] = peer
+        self._push_expiry(peer)
         self.ui_queue.put(("peer_joined", peer_id))
 
         await self._sync_store(peer)
@@ -441,32 +591,57 @@ class Network:
     # Sync — send all current messages to a newly connected peer
     # ------------------------------------------------------------------
 
-    async def _sync_store(self, peer: Peer):
+    def _sync_chunks(self, framed: bool) -> list[bytes]:
+        """The whole store as ready-to-write chunks, rebuilt only when it changes."""
+        self.store.prune()
+        version = self.store.version
+        cached = self._sync_cache.get(framed)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        chunks: list[bytes] = []
+        buf: list[bytes] = []
+        size = 0
         for msg in self.store.get_all():
-            line = json.dumps({"type": "msg", "data": msg.to_dict()}) + "\n"
-            try:
-                peer.writer.write(line.encode())
-            except Exception:
-                return
+            frame = _frame(msg.wire_bytes(), framed)
+            buf.append(frame)
+            size += len(frame)
+            if size >= _SYNC_CHUNK_BYTES:
+                chunks.append(b"".join(buf))
+                buf.clear()
+                size = 0
+        if buf:
+            chunks.append(b"".join(buf))
+        self._sync_cache[framed] = (version, chunks)
+        return chunks
+
+    async def _sync_store(self, peer: Peer):
         try:
-            await peer.writer.drain()
+            for chunk in self._sync_chunks(peer.framed):
+                peer.writer.write(chunk)
+                await peer.writer.drain()
         except Exception:
             pass
 
     # ------------------------------------------------------------------
-    # Listener — read NDJSON lines from a peer
+    # Listener — read frames (length-prefixed or NDJSON lines) from a peer
     # ------------------------------------------------------------------
 
     async def _listen(self, peer: Peer):
         try:
             while self._running:
-                raw = await peer.reader.readline()
-                if not raw:
-                    break
-                if len(raw) > 65536:
-                    continue
+                if peer.framed:
+                    size = int.from_bytes(await peer.reader.readexactly(4), "big")
+                    if size > MAX_FRAME_BYTES:
+                        break
+                    raw = await peer.reader.readexactly(size)
+                else:
+                    raw = await peer.reader.readline()
+                    if not raw:
+                        break
+                    if len(raw) > MAX_FRAME_BYTES:
+                        continue
                 try:
-                    data = json.loads(raw.decode().strip())
+                    data = _loads(raw)
                 except (json.JSONDecodeError, UnicodeDecodeError):
                     continue
                 await self._dispatch(data, peer)
@@ -495,57 +670,99 @@ class Network:
         except Exception:
             return
 
-        if msg.id in self.seen_ids:
-            return
-        self.seen_ids.add(msg.id)
-
-        if msg.is_expired:
-            return
-
-        if not verify_pow(msg.pow_payload(), msg.nonce, msg.pow_hash, POW_DIFFICULTY):
+        if not self._add_seen(msg.id):
             return
 
-        if not verify(msg.author_pubkey, msg.signature, msg.signable_payload()):
+        # Cheap rejections first; only then spend a hash and an ed25519 verify.
+        if not msg.has_finite_times or msg.is_expired:
             return
 
         if msg.author_name in self.claimed_names:
             if self.claimed_names[msg.author_name] != msg.author_pubkey:
                 return
 
+        if not await self._verify(msg):
+            return
+
         if self.store.add(msg):
             self.ui_queue.put(("new_msg", msg))
             await self._gossip(msg, exclude=from_peer)
 
+    def _verify(self, msg: Message) -> asyncio.Future:
+        """Queue msg's PoW and signature check for the verification pool.
+
+        Messages queued in the same loop iteration go out as one job.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        if not self._verify_pending:
+            loop.call_soon(self._flush_verify)
+        self._verify_pending.append((
+            (msg.pow_payload(), msg.nonce, msg.pow_hash,
+             msg.author_pubkey, msg.signature, msg.signable_payload()),
+            fut,
+        ))
+        return fut
+
+    def _flush_verify(self):
+        pending, self._verify_pending = self._verify_pending, []
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(pending), _VERIFY_BATCH):
+            chunk = pending[i:i + _VERIFY_BATCH]
+            try:
+                job = loop.run_in_executor(
+                    self._verify_pool, _verify_batch, [item for item, _ in chunk],
+                )
+            except RuntimeError:    # pool shut down by stop()
+                for _, fut in chunk:
+                    fut.set_result(False)
+                continue
+            job.add_done_callback(functools.partial(_resolve_verified, [f for _, f in chunk]))
+
     # ------------------------------------------------------------------
     # Broadcast / gossip
     # ------------------------------------------------------------------
 
     async def broadcast(self, msg: Message):
-        self.seen_ids.add(msg.id)
-        line = json.dumps({"type": "msg", "data": msg.to_dict()}) + "\n"
-        encoded = line.encode()
-        for peer in list(self.peers.values()):
-            try:
-                peer.writer.write(encoded)
-                await peer.writer.drain()
-            except Exception:
-                await self._drop_peer(peer)
+        await self.broadcast_many([msg])
 
-        await self._relay_broadcast(msg)
+    async def broadcast_many(self, msgs: list[Message]):
+        """Broadcast several messages with one coalesced write per peer."""
+        for msg in msgs:
+            self._add_seen(msg.id)
+        encoded = _frames([msg.wire_bytes() for msg in msgs])
+        await self._send_all(list(self.peers.values()), encoded)
+
+        for msg in msgs:
+            await self._relay_broadcast(msg)
 
     async def _gossip(self, msg: Message, exclude: Optional[Peer]):
-        line = json.dumps({"type": "msg", "data": msg.to_dict()}) + "\n"
-        encoded = line.encode()
-        for peer in list(self.peers.values()):
-            if peer is exclude:
-                continue
+        encoded = _frames([msg.wire_bytes()])
+        await self._send_all([p for p in self.peers.values() if p is not exclude], encoded)
+
+        await self._relay_broadcast(msg)
+
+    async def _send_all(self, peers: list[Peer], encoded: dict[bool, bytes]):
+        """Write to every peer, then wait together on those that are backed up."""
+        backed_up = []
+        for peer in peers:
             try:
-                peer.writer.write(encoded)
-                await peer.writer.drain()
+                writer = peer.writer
+                if writer.is_closing():
+                    raise ConnectionResetError
+                writer.write(encoded[peer.framed])
+                if writer.transport.get_write_buffer_size() > _DRAIN_ABOVE:
+                    backed_up.append(peer)
             except Exception:
                 await self._drop_peer(peer)
-
-        await self._relay_broadcast(msg)
+        if not backed_up:
+            return
+        results = await asyncio.gather(
+            *(peer.writer.drain() for peer in backed_up), return_exceptions=True,
+        )
+        for peer, result in zip(backed_up, results):
+            if isinstance(result, Exception):
+                await self._drop_peer(peer)
 
     # ------------------------------------------------------------------
     # Peer management
@@ -555,6 +772,8 @@ class Network:
         peer_id = f"{peer.name}#{peer.tag}"
         if peer_id in self.peers:
             del self.peers[peer_id]
+            if peer.address and self._by_addr.get(tuple(peer.address[:2])) is peer:
+                del self._by_addr[tuple(peer.address[:2])]
             if peer.name in self.claimed_names:
                 if self.claimed_names[peer.name] == peer.pubkey:
                     del self.claimed_names[peer.name]
@@ -585,39 +804,54 @@ class Network:
         except Exception:
             return
         sock.setblocking(False)
-        loop = asyncio.get_event_loop()
-        while self._running:
-            try:
-                data, addr = await loop.sock_recvfrom(sock, 2048)
-                info = json.loads(data.decode())
-                if info.get("type") != "discover":
-                    continue
-                if info.get("pubkey") == self.pubkey_hex:
-                    continue
-                peer_id = f"{info['name']}#{info['tag']}"
-                if peer_id not in self.peers:
-                    host = addr[0]
-                    port = info.get("tcp_port", TCP_PORT_DEFAULT)
-                    asyncio.create_task(self.connect_to(host, port))
-            except Exception:
-                await asyncio.sleep(1)
+        # A datagram endpoint rather than sock_recvfrom, which uvloop lacks;
+        # datagrams are handled from its callback, so no task stays parked
+        # here. stop() closes the transport.
+        try:
+            self._discovery, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: _DiscoveryProtocol(self), sock=sock,
+            )
+        except Exception:
+            sock.close()
+
+    def _on_discover(self, data: bytes, addr):
+        try:
+            info = _unpack_discover(data)
+            if info.get("type") != "discover":
+                return
+            if info.get("pubkey") == self.pubkey_hex:
+                return
+            peer_id = f"{info['name']}#{info['tag']}"
+            if peer_id not in self.peers:
+                host = addr[0]
+                port = info.get("tcp_port", TCP_PORT_DEFAULT)
+                asyncio.create_task(self.connect_to(host, port))
+        except Exception:
+            pass
 
     async def _multicast_announce(self):
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
         sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
-        payload = json.dumps({
-            "type": "discover",
-            "name": self.name,
-            "tag": self.tag,
-            "pubkey": self.pubkey_hex,
-            "tcp_port": self.tcp_port,
-        }).encode()
-        while self._running:
-            try:
-                sock.sendto(payload, (MULTICAST_GROUP, MULTICAST_PORT))
-            except Exception:
-                pass
-            await asyncio.sleep(10)
+        sock.setblocking(False)
+        # Sent through a datagram transport: never blocks the loop, and
+        # works on uvloop, which has no sock_sendto.
+        try:
+            transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                asyncio.DatagramProtocol, sock=sock,
+            )
+        except Exception:
+            sock.close()
+            return
+        dest = (MULTICAST_GROUP, MULTICAST_PORT)
+        try:
+            while self._running:
+                try:
+                    transport.sendto(self._announce_payload, dest)
+                except Exception:
+                    pass
+                await asyncio.sleep(10)
+        finally:
+            transport.close()
 
     # ------------------------------------------------------------------
     # Background maintenance
@@ -625,22 +859,39 @@ class Network:
 
     async def _heartbeat_loop(self):
         while self._running:
-            hb = json.dumps({"type": "heartbeat", "name": self.name, "tag": self.tag}) + "\n"
-            encoded = hb.encode()
-            for peer in list(self.peers.values()):
-                if not peer.is_alive():
-                    await self._drop_peer(peer)
-                    continue
-                try:
-                    peer.writer.write(encoded)
-                    await peer.writer.drain()
-                except Exception:
-                    await self._drop_peer(peer)
+            encoded = _frames([_dumps({"type": "heartbeat", "name": self.name, "tag": self.tag})])
+            await self._send_all(list(self.peers.values()), encoded)
             await asyncio.sleep(HEARTBEAT_INTERVAL)
 
+    def _push_expiry(self, peer: Peer):
+        heapq.heappush(
+            self._expiry, (peer.last_seen + PEER_TIMEOUT, next(self._expiry_seq), peer),
+        )
+
+    async def _expire_peers(self):
+        """Drop silent peers, touching only heap entries whose deadline passed."""
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, peer = heapq.heappop(self._expiry)
+            if self.peers.get(f"{peer.name}#{peer.tag}") is not peer:
+                continue
+            if peer.is_alive():
+                self._push_expiry(peer)
+            else:
+                await self._drop_peer(peer)
+
+    def _add_seen(self, msg_id: str) -> bool:
+        """Record msg_id; False if already seen. Oldest ids age out one by one."""
+        if msg_id in self.seen_ids:
+            return False
+        self.seen_ids.add(msg_id)
+        self._seen_order.append(msg_id)
+        if len(self._seen_order) > MAX_SEEN_IDS:
+            self.seen_ids.discard(self._seen_order.popleft())
+        return True
+
     async def _prune_loop(self):
         while self._running:
             self.store.prune()
-            if len(self.seen_ids) > 10_000:
-                self.seen_ids.clear()
+            await self._expire_peers()
             await asyncio.sleep(PRUNE_INTERVAL)
@@ -1,10 +1,12 @@
 """
 On-chain relay discovery via the LimesRegistry contract on Base L2.
 Falls back to hardcoded RELAY_SERVERS if the contract call fails or returns empty.
-Caches the relay list for 5 minutes.
+Caches the relay list for 5 minutes, serving the stale list while it refreshes.
 """
 
+import asyncio
 import json
+import threading
 import time
 from typing import Optional
 
@@ -16,25 +18,31 @@ _cache: Optional[list[dict]] = None
 _cache_time: float = 0.0
 CACHE_TTL = 300  # 5 minutes
 
+_contract = None                    # built on first use, then reused
+_refresh_lock = threading.Lock()    # one background refresh at a time
 
-def fetch_relays_from_chain() -> list[dict]:
-    """Fetch relay list from LimesRegistry contract. Returns list of {operator, url, registeredAt}."""
-    global _cache, _cache_time
-
-    if _cache is not None and time.time() - _cache_time < CACHE_TTL:
-        return _cache
-
-    if not REGISTRY_CONTRACT:
-        return []
 
-    try:
+def _get_contract():
+    global _contract
+    if _contract is None:
+        import requests
+        from requests.adapters import HTTPAdapter
         from web3 import Web3
-        w3 = Web3(Web3.HTTPProvider(CHAIN_RPC))
-        contract = w3.eth.contract(
+        # One keep-alive pool, so refreshes skip the TCP/TLS handshake.
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        w3 = Web3(Web3.HTTPProvider(CHAIN_RPC, session=session))
+        _contract = w3.eth.contract(
             address=Web3.to_checksum_address(REGISTRY_CONTRACT),
             abi=REGISTRY_ABI,
         )
-        raw = contract.functions.getRelays().call()
+    return _contract
+
+
+def _refresh() -> list[dict]:
+    global _cache, _cache_time
+    try:
+        raw = _get_contract().functions.getRelays().call()
         relays = [
             {"operator": r[0], "url": r[1], "registeredAt": r[2]}
             for r in raw
@@ -46,9 +54,52 @@ def fetch_relays_from_chain() -> list[dict]:
         return []
 
 
-def get_relay_urls() -> list[str]:
-    """Get relay WebSocket URLs, preferring on-chain registry with hardcoded fallback."""
-    chain_relays = fetch_relays_from_chain()
+def _refresh_in_background():
+    if not _refresh_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            _refresh()
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def _cached() -> Optional[list[dict]]:
+    """Cached relays, stale-while-revalidate: past the TTL a non-empty list is
+    still returned while a refresh runs in the background."""
+    if _cache is None:
+        return None
+    if time.time() - _cache_time >= CACHE_TTL:
+        if not _cache:
+            return None
+        _refresh_in_background()
+    return _cache
+
+
+def fetch_relays_from_chain() -> list[dict]:
+    """Fetch relay list from LimesRegistry contract. Returns list of {operator, url, registeredAt}."""
+    if not REGISTRY_CONTRACT:
+        return []
+    cached = _cached()
+    if cached is not None:
+        return cached
+    return _refresh()
+
+
+async def fetch_relays_from_chain_async() -> list[dict]:
+    """fetch_relays_from_chain without blocking the event loop on the RPC call."""
+    if not REGISTRY_CONTRACT:
+        return []
+    cached = _cached()
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(_refresh)
+
+
+def _relay_urls(chain_relays: list[dict]) -> list[str]:
     if chain_relays:
         urls = [r["url"] for r in chain_relays if r.get("url")]
         if urls:
@@ -56,6 +107,16 @@ def get_relay_urls() -> list[str]:
     return list(RELAY_SERVERS)
 
 
+def get_relay_urls() -> list[str]:
+    """Get relay WebSocket URLs, preferring on-chain registry with hardcoded fallback."""
+    return _relay_urls(fetch_relays_from_chain())
+
+
+async def get_relay_urls_async() -> list[str]:
+    """get_relay_urls for coroutines."""
+    return _relay_urls(await fetch_relays_from_chain_async())
+
+
 def get_relays_with_info() -> list[dict]:
     """Get full relay info (for the scanner UI). Falls back to hardcoded with minimal info."""
     chain_relays = fetch_relays_from_chain()
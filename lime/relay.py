@@ -23,15 +23,19 @@ Run with: limes relay
 import asyncio
 import json
 import random
+from collections import deque
 import time
 import uuid
 
+import orjson
+
 try:
     import websockets
-    from websockets.asyncio.server import serve
+    from websockets.asyncio.server import broadcast, serve
 except ImportError:
     websockets = None
     serve = None
+    broadcast = None
 
 DEFAULT_PORT = 4210
 _DELAY_MIN = 0.05
@@ -43,6 +47,8 @@ MAX_MSG_BYTES = 65536          # 64KB per WebSocket frame
 RATE_LIMIT_PER_SEC = 10
 RATE_LIMIT_WINDOW = 1.0
 IDLE_TIMEOUT = 300             # 5 minutes
+SEND_QUEUE_SIZE = 256          # frames queued per peer before new ones are dropped
+ACTIVITY_FLUSH_INTERVAL = 1.0  # seconds between scanner activity_batch events
 
 _clients: dict[str, dict] = {}
 _scanners: set = set()
@@ -53,48 +59,93 @@ _stats = {
 }
 _relay_wallet: str | None = None
 _scanner_enabled = False
+_activity_count = 0            # msgs forwarded since the last activity_batch
+
+
+def _dumps(obj) -> bytes:
+    """orjson-encoded frame; stdlib json for what orjson refuses (e.g. >64-bit ints)."""
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        return json.dumps(obj).encode()
+
+
+def _loads(raw):
+    """orjson decode, retried with stdlib json for inputs only it accepts (NaN...)."""
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
 
 
-async def _broadcast_to_scanners(event: dict):
+def _broadcast_to_scanners(event: dict):
     if not _scanners:
         return
-    encoded = json.dumps(event)
-    dead = []
-    for ws in _scanners:
+    # Closed scanners are skipped by broadcast() and removed by _handle_scanner.
+    broadcast(list(_scanners), _dumps(event), text=True)
+
+
+def _forward_to_peers(payload: bytes, exclude: str | None):
+    """Queue payload for every peer except exclude, each with its own random delay."""
+    now = asyncio.get_running_loop().time()
+    for sid, info in _clients.items():
+        if sid == exclude:
+            continue
         try:
-            await ws.send(encoded)
+            info["q"].put_nowait((now + random.uniform(_DELAY_MIN, _DELAY_MAX), payload))
+        except asyncio.QueueFull:
+            pass    # peer isn't keeping up; drop rather than buffer without bound
+
+
+async def _drain(ws, q: asyncio.Queue):
+    """One long-lived sender per peer: deliver queued frames once each is due."""
+    loop = asyncio.get_running_loop()
+    while True:
+        due, payload = await q.get()
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await ws.send(payload, text=True)
         except Exception:
-            dead.append(ws)
-    for ws in dead:
-        _scanners.discard(ws)
+            return
 
 
-async def _delayed_forward(ws, payload: str):
-    await asyncio.sleep(random.uniform(_DELAY_MIN, _DELAY_MAX))
-    try:
-        await ws.send(payload)
-    except Exception:
-        pass
+async def _flush_activity():
+    """Report forwarded traffic to scanners as one event per interval."""
+    global _activity_count
+    while True:
+        await asyncio.sleep(ACTIVITY_FLUSH_INTERVAL)
+        if _activity_count:
+            count, _activity_count = _activity_count, 0
+            _broadcast_to_scanners({
+                "type": "activity_batch",
+                "count": count,
+                "ts": time.time(),
+            })
 
 
 class _RateLimiter:
     __slots__ = ("_timestamps", "_limit", "_window")
 
     def __init__(self, limit: int = RATE_LIMIT_PER_SEC, window: float = RATE_LIMIT_WINDOW):
-        self._timestamps: list[float] = []
+        self._timestamps: deque[float] = deque()
         self._limit = limit
         self._window = window
 
     def allow(self) -> bool:
         now = time.monotonic()
-        self._timestamps = [t for t in self._timestamps if now - t < self._window]
-        if len(self._timestamps) >= self._limit:
+        ts = self._timestamps
+        while ts and now - ts[0] >= self._window:
+            ts.popleft()
+        if len(ts) >= self._limit:
             return False
-        self._timestamps.append(now)
+        ts.append(now)
         return True
 
 
 async def _handler(ws):
+    global _activity_count
     path = getattr(ws, "request", None)
     if path and hasattr(path, "path"):
         if path.path == "/scan":
@@ -115,11 +166,15 @@ async def _handler(ws):
     session_id = None
     _stats["total_connections"] += 1
     limiter = _RateLimiter()
+    send_q: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+    sender = None
     last_activity = time.monotonic()
 
     try:
-        async for raw in ws:
-            if isinstance(raw, (bytes, str)) and len(raw) > MAX_MSG_BYTES:
+        while True:
+            # Raw bytes for text frames too: _loads parses UTF-8 directly.
+            raw = await ws.recv(decode=False)
+            if len(raw) > MAX_MSG_BYTES:
                 continue
 
             last_activity = time.monotonic()
@@ -128,7 +183,7 @@ async def _handler(ws):
                 continue
 
             try:
-                data = json.loads(raw)
+                data = _loads(raw)
             except (json.JSONDecodeError, UnicodeDecodeError):
                 continue
 
@@ -140,7 +195,7 @@ async def _handler(ws):
             if msg_type == "hello":
                 proposed_id = data.get("session", "")
                 if not proposed_id or proposed_id in _clients:
-                    proposed_id = str(uuid.uuid4())
+                    proposed_id = uuid.uuid4().hex
 
                 if session_id and session_id in _clients:
                     del _clients[session_id]
@@ -150,45 +205,45 @@ async def _handler(ws):
                 curve_pk_sig = str(data.get("curve_pk_sig", ""))[:256]
                 verify_key = str(data.get("verify_key", ""))[:128]
                 _clients[session_id] = {
-                    "ws": ws, "curve_pk": curve_pk,
+                    "ws": ws, "q": send_q, "curve_pk": curve_pk,
                     "curve_pk_sig": curve_pk_sig, "verify_key": verify_key,
+                    # This peer's relay_peers entry, encoded once for every later join.
+                    "entry": _dumps({
+                        "session": session_id, "curve_pk": curve_pk,
+                        "curve_pk_sig": curve_pk_sig, "verify_key": verify_key,
+                    }),
                 }
+                if sender is None:
+                    sender = asyncio.create_task(_drain(ws, send_q))
 
-                peer_list = [
-                    {"session": sid, "curve_pk": info["curve_pk"],
-                     "curve_pk_sig": info.get("curve_pk_sig", ""),
-                     "verify_key": info.get("verify_key", "")}
-                    for sid, info in _clients.items()
-                    if sid != session_id
-                ]
-                await ws.send(json.dumps({
-                    "type": "relay_peers",
-                    "peers": peer_list,
-                    "count": len(peer_list),
-                }))
+                others = [info["entry"] for sid, info in _clients.items() if sid != session_id]
+                await ws.send(
+                    b'{"type":"relay_peers","peers":[' + b",".join(others)
+                    + b'],"count":' + str(len(others)).encode() + b"}",
+                    text=True,
+                )
 
                 if _relay_wallet:
-                    await ws.send(json.dumps({
+                    await ws.send(_dumps({
                         "type": "relay_wallet",
                         "address": _relay_wallet,
-                    }))
+                    }), text=True)
 
-                join_msg = json.dumps({
+                now = time.time()
+                join_msg = _dumps({
                     "type": "relay_join",
                     "session": session_id,
                     "curve_pk": curve_pk,
                     "curve_pk_sig": curve_pk_sig,
                     "verify_key": verify_key,
-                    "ts": time.time(),
+                    "ts": now,
                 })
-                for sid, info in list(_clients.items()):
-                    if sid != session_id:
-                        asyncio.create_task(_delayed_forward(info["ws"], join_msg))
+                _forward_to_peers(join_msg, session_id)
 
-                await _broadcast_to_scanners({
+                _broadcast_to_scanners({
                     "type": "peer_join",
                     "peers_online": len(_clients),
-                    "ts": time.time(),
+                    "ts": now,
                 })
                 continue
 
@@ -197,34 +252,26 @@ async def _handler(ws):
 
             if msg_type == "msg":
                 _stats["total_messages"] += 1
+                _activity_count += 1
 
-                await _broadcast_to_scanners({
-                    "type": "activity",
-                    "ts": time.time(),
-                })
-
-                encoded = json.dumps(data)
+                encoded = _dumps(data)
                 if len(encoded) <= MAX_MSG_BYTES:
-                    for sid, info in list(_clients.items()):
-                        if sid != session_id:
-                            asyncio.create_task(_delayed_forward(info["ws"], encoded))
+                    _forward_to_peers(encoded, session_id)
                 continue
 
             if msg_type == "key_request":
-                encoded = json.dumps(data)
+                encoded = _dumps(data)
                 if len(encoded) <= MAX_MSG_BYTES:
-                    for sid, info in list(_clients.items()):
-                        if sid != session_id:
-                            asyncio.create_task(_delayed_forward(info["ws"], encoded))
+                    _forward_to_peers(encoded, session_id)
                 continue
 
             if msg_type == "dm":
                 target = data.get("to")
                 if isinstance(target, str) and target in _clients:
-                    payload = json.dumps(data)
+                    payload = _dumps(data)
                     if len(payload) <= MAX_MSG_BYTES:
                         try:
-                            await _clients[target]["ws"].send(payload)
+                            await _clients[target]["ws"].send(payload, text=True)
                         except Exception:
                             pass
                 continue
@@ -232,10 +279,10 @@ async def _handler(ws):
             if msg_type == "key_share":
                 target = data.get("to")
                 if isinstance(target, str) and target in _clients:
-                    payload = json.dumps(data)
+                    payload = _dumps(data)
                     if len(payload) <= MAX_MSG_BYTES:
                         try:
-                            await _clients[target]["ws"].send(payload)
+                            await _clients[target]["ws"].send(payload, text=True)
                         except Exception:
                             pass
                 continue
@@ -246,16 +293,14 @@ async def _handler(ws):
     except Exception:
         pass
     finally:
+        if sender is not None:
+            sender.cancel()
         if session_id and session_id in _clients:
             del _clients[session_id]
-            leave_msg = json.dumps({"type": "relay_leave", "session": session_id})
-            for sid, info in list(_clients.items()):
-                try:
-                    await info["ws"].send(leave_msg)
-                except Exception:
-                    pass
-
-            await _broadcast_to_scanners({
+            leave_msg = _dumps({"type": "relay_leave", "session": session_id})
+            broadcast([info["ws"] for info in _clients.values()], leave_msg, text=True)
+
+            _broadcast_to_scanners({
                 "type": "peer_leave",
                 "peers_online": len(_clients),
                 "ts": time.time(),
@@ -272,14 +317,14 @@ async def _handle_scanner(ws):
 
     _scanners.add(ws)
     try:
-        await ws.send(json.dumps({
+        await ws.send(_dumps({
             "type": "snapshot",
             "peers_online": len(_clients),
             "total_messages": _stats["total_messages"],
             "total_connections": _stats["total_connections"],
             "uptime": time.time() - _stats["start_time"],
             "relay_wallet": _relay_wallet,
-        }))
+        }), text=True)
         async for _ in ws:
             pass
     except Exception:
@@ -327,7 +372,11 @@ async def run_relay(host: str = "0.0.0.0", port: int | None = None, wallet: str
         print()
         asyncio.create_task(start_relay_loop(relay_url))
 
-    ws_kwargs: dict = {"max_size": MAX_MSG_BYTES}
+    asyncio.create_task(_flush_activity())
+
+    # No permessage-deflate: peer traffic is ciphertext, and per-connection
+    # zlib contexts would compress every fanned-out frame once per recipient.
+    ws_kwargs: dict = {"max_size": MAX_MSG_BYTES, "compression": None}
     async with serve(_handler, host, port, **ws_kwargs):
         while True:
             await asyncio.sleep(30)
@@ -335,7 +384,13 @@ async def run_relay(host: str = "0.0.0.0", port: int | None = None, wallet: str
 
 
 def main(port: int = DEFAULT_PORT, wallet: str | None = None, scanner: bool = False):
-    asyncio.run(run_relay(port=port, wallet=wallet, enable_scanner=scanner))
+    coro = run_relay(port=port, wallet=wallet, enable_scanner=scanner)
+    try:
+        import uvloop
+    except ImportError:     # optional [fast] extra; Windows keeps asyncio's loop
+        asyncio.run(coro)
+    else:
+        uvloop.run(coro)
 
 
 if __name__ == "__main__":
@@ -15,36 +15,43 @@ Run with: limes relay (scanner is embedded)
 """
 
 import asyncio
+import collections
 import json
 import time
 import uuid
 
+import orjson
+
 try:
     import websockets
-    from websockets.asyncio.server import serve
+    from websockets.asyncio.server import broadcast, serve
 except ImportError:
     websockets = None
     serve = None
+    broadcast = None
 
 from lime.config import MESSAGE_TTL, POW_DIFFICULTY, RELAY_SERVERS
 from lime.crypto import generate_keypair, verify
 from lime.encryption import (
-    curve_public_from_hex,
     decrypt_message,
     generate_room_key,
-    seal_room_key,
+    seal_room_key_for,
     sign_curve_pk,
     signing_to_curve_private,
     unseal_room_key,
     verify_curve_pk_sig,
     verify_to_curve_public,
 )
-from lime.message import Message, verify_pow
+from lime.message import Message, finite_times, verify_pow
 
 DEFAULT_SCANNER_PORT = 4211
+MAX_SEEN_IDS = 50_000          # message ids remembered for dedup (LRU)
+PRUNE_INTERVAL = 5.0           # seconds between sweeps of expired messages/authors
 
 _browser_clients: set = set()
-_recent_messages: list = []
+# (expires_at, encoded {"data": msg, "relayed_at": ts} snapshot entry); encoded
+# once on arrival and spliced into every browser snapshot as-is.
+_recent_messages: list[tuple[float, bytes]] = []
 _active_authors: dict[str, float] = {}  # name#tag -> last seen timestamp
 _stats = {
     "peers_online": 0,
@@ -54,38 +61,53 @@ _stats = {
 _relay_wallet: str | None = None
 
 
-async def _broadcast_to_browsers(event: dict):
-    if not _browser_clients:
-        return
-    encoded = json.dumps(event)
-    dead = []
-    for ws in _browser_clients:
-        try:
-            await ws.send(encoded)
-        except Exception:
-            dead.append(ws)
-    for ws in dead:
-        _browser_clients.discard(ws)
+def _dumps(obj) -> bytes:
+    """orjson-encoded frame; stdlib json for what orjson refuses (e.g. >64-bit ints)."""
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        return json.dumps(obj).encode()
+
+
+def _loads(raw):
+    """orjson decode, retried with stdlib json for inputs only it accepts (NaN...)."""
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
+
+
+def _broadcast_to_browsers(event: dict):
+    if _browser_clients:
+        _send_to_browsers(_dumps(event))
+
+
+def _send_to_browsers(frame: bytes):
+    # Closed browsers are skipped by broadcast() and removed by handle_browser.
+    broadcast(list(_browser_clients), frame, text=True)
 
 
 async def handle_browser(ws):
     _browser_clients.add(ws)
     try:
         now = time.time()
-        active = [m for m in _recent_messages if now - m["timestamp"] < m.get("ttl", MESSAGE_TTL)]
+        active = [entry for expires_at, entry in _recent_messages if now < expires_at]
         authors = [
             name for name, ts in _active_authors.items()
             if now - ts < MESSAGE_TTL
         ]
-        await ws.send(json.dumps({
+        head = _dumps({
             "type": "snapshot",
             "peers_online": _stats["peers_online"],
             "peers": authors,
             "total_messages": _stats["total_messages"],
             "uptime": now - _stats["start_time"],
             "relay_wallet": _relay_wallet,
-            "recent_messages": [{"data": m, "relayed_at": m.get("timestamp", now)} for m in active],
-        }))
+        })
+        await ws.send(
+            head[:-1] + b',"recent_messages":[' + b",".join(active) + b"]}",
+            text=True,
+        )
         async for _ in ws:
             pass
     except Exception:
@@ -94,6 +116,16 @@ async def handle_browser(ws):
         _browser_clients.discard(ws)
 
 
+async def _periodic_prune():
+    """Drop expired messages and idle authors; readers also filter by time."""
+    while True:
+        await asyncio.sleep(PRUNE_INTERVAL)
+        now = time.time()
+        _recent_messages[:] = [r for r in _recent_messages if now < r[0]]
+        for a in [a for a, ts in _active_authors.items() if now - ts > MESSAGE_TTL]:
+            del _active_authors[a]
+
+
 async def start_relay_loop(relay_url: str):
     """Connect to a relay as a full peer and decrypt messages.
 
@@ -108,17 +140,19 @@ async def start_relay_loop(relay_url: str):
     curve_pk_hex = curve_public.encode().hex()
     curve_pk_sig = sign_curve_pk(sk, curve_pk_hex)
     verify_key_hex = vk.encode().hex()
-    session_id = str(uuid.uuid4())
+    session_id = uuid.uuid4().hex
 
     room_key: list[bytes | None] = [None]
     room_key_event = asyncio.Event()
-    seen_ids: set[str] = set()
+    seen_ids: collections.OrderedDict[str, None] = collections.OrderedDict()
     verified_peers: dict[str, str] = {}
 
+    asyncio.create_task(_periodic_prune())
+
     while True:
         try:
             async with websockets.connect(relay_url) as ws:
-                await ws.send(json.dumps({
+                await ws.send(_dumps({
                     "type": "hello",
                     "session": session_id,
                     "curve_pk": curve_pk_hex,
@@ -126,9 +160,11 @@ async def start_relay_loop(relay_url: str):
                     "verify_key": verify_key_hex,
                 }))
 
-                async for raw in ws:
+                while True:
+                    # Raw bytes for text frames too: _loads parses UTF-8 directly.
+                    raw = await ws.recv(decode=False)
                     try:
-                        data = json.loads(raw)
+                        data = _loads(raw)
                     except json.JSONDecodeError:
                         continue
 
@@ -145,7 +181,7 @@ async def start_relay_loop(relay_url: str):
                             if pvk and cpk and sig and verify_curve_pk_sig(pvk, cpk, sig):
                                 verified_peers[sid] = cpk
                         if peers and room_key[0] is None:
-                            await ws.send(json.dumps({
+                            await ws.send(_dumps({
                                 "type": "key_request",
                                 "session": session_id,
                                 "curve_pk": curve_pk_hex,
@@ -164,16 +200,15 @@ async def start_relay_loop(relay_url: str):
                         peer_sig = data.get("curve_pk_sig", "")
                         if peer_vk and peer_sig and verify_curve_pk_sig(peer_vk, peer_curve_pk, peer_sig):
                             verified_peers[peer_session] = peer_curve_pk
-                        await _broadcast_to_browsers({
+                        _broadcast_to_browsers({
                             "type": "peer_join",
                             "peers_online": _stats["peers_online"],
                             "ts": data.get("ts", time.time()),
                         })
                         if room_key[0] and peer_curve_pk and peer_session in verified_peers:
                             try:
-                                rpk = curve_public_from_hex(peer_curve_pk)
-                                sealed = seal_room_key(room_key[0], rpk)
-                                await ws.send(json.dumps({
+                                sealed = seal_room_key_for(room_key[0], peer_curve_pk)
+                                await ws.send(_dumps({
                                     "type": "key_share",
                                     "to": peer_session,
                                     "sealed": sealed,
@@ -183,7 +218,7 @@ async def start_relay_loop(relay_url: str):
 
                     elif t == "relay_leave":
                         _stats["peers_online"] = max(0, _stats["peers_online"] - 1)
-                        await _broadcast_to_browsers({
+                        _broadcast_to_browsers({
                             "type": "peer_leave",
                             "peers_online": _stats["peers_online"],
                             "ts": time.time(),
@@ -207,9 +242,8 @@ async def start_relay_loop(relay_url: str):
                             verified_peers[peer_session] = peer_curve_pk
                         if room_key[0] and peer_curve_pk and peer_session != session_id and peer_session in verified_peers:
                             try:
-                                rpk = curve_public_from_hex(peer_curve_pk)
-                                sealed = seal_room_key(room_key[0], rpk)
-                                await ws.send(json.dumps({
+                                sealed = seal_room_key_for(room_key[0], peer_curve_pk)
+                                await ws.send(_dumps({
                                     "type": "key_share",
                                     "to": peer_session,
                                     "sealed": sealed,
@@ -223,42 +257,43 @@ async def start_relay_loop(relay_url: str):
                             try:
                                 envelope = data.get("envelope", "")
                                 plaintext = decrypt_message(envelope, room_key[0])
-                                msg_data = json.loads(plaintext)
-                                msg = Message.from_dict(msg_data)
+                                msg_data = _loads(plaintext)
+                                now = time.time()
 
-                                if msg.id in seen_ids:
+                                # Duplicates and expired messages are dropped
+                                # from the dict, before building a Message.
+                                msg_id = msg_data["id"]
+                                if msg_id in seen_ids:
+                                    seen_ids.move_to_end(msg_id)
                                     continue
-                                seen_ids.add(msg.id)
-                                if msg.is_expired:
+                                seen_ids[msg_id] = None
+                                if len(seen_ids) > MAX_SEEN_IDS:
+                                    seen_ids.popitem(last=False)
+                                ts, ttl = msg_data["timestamp"], msg_data["ttl"]
+                                if not finite_times(ts, ttl) or now > ts + ttl:
                                     continue
+
+                                msg = Message.from_dict(msg_data)
                                 if not verify_pow(msg.pow_payload(), msg.nonce, msg.pow_hash, POW_DIFFICULTY):
                                     continue
                                 if not verify(msg.author_pubkey, msg.signature, msg.signable_payload()):
                                     continue
 
-                                md = msg.to_dict()
-                                _recent_messages.append(md)
+                                data_json = msg.json_bytes()
+                                _recent_messages.append((
+                                    msg.expires_at,
+                                    b'{"data":' + data_json
+                                    + b',"relayed_at":' + _dumps(msg.timestamp) + b"}",
+                                ))
 
                                 author = f"{msg.author_name}#{msg.author_tag}"
-                                _active_authors[author] = time.time()
+                                _active_authors[author] = now
 
-                                now = time.time()
-                                _recent_messages[:] = [
-                                    m for m in _recent_messages
-                                    if now - m["timestamp"] < m.get("ttl", MESSAGE_TTL)
-                                ]
-                                expired_authors = [
-                                    a for a, ts in _active_authors.items()
-                                    if now - ts > MESSAGE_TTL
-                                ]
-                                for a in expired_authors:
-                                    del _active_authors[a]
-
-                                await _broadcast_to_browsers({
-                                    "type": "message",
-                                    "data": md,
-                                    "relayed_at": time.time(),
-                                })
+                                if _browser_clients:
+                                    _send_to_browsers(
+                                        b'{"type":"message","data":' + data_json
+                                        + b',"relayed_at":' + _dumps(now) + b"}"
+                                    )
                             except Exception:
                                 pass
 
@@ -299,7 +334,7 @@ async def run_scanner(
         while True:
             await asyncio.sleep(30)
             now = time.time()
-            active = len([m for m in _recent_messages if now - m["timestamp"] < m.get("ttl", MESSAGE_TTL)])
+            active = sum(1 for expires_at, _ in _recent_messages if now < expires_at)
             print(f"  [scanner: {len(_browser_clients)} browsers | {active} active msgs | {_stats['total_messages']} total]")
 
 
@@ -309,7 +344,13 @@ def main(relay_url: str | None = None, port: int | None = None):
         port = int(os.environ.get("PORT", DEFAULT_SCANNER_PORT))
     if not relay_url:
         relay_url = RELAY_SERVERS[0] if RELAY_SERVERS else "ws://localhost:4210"
-    asyncio.run(run_scanner(relay_url=relay_url, scanner_port=port))
+    coro = run_scanner(relay_url=relay_url, scanner_port=port)
+    try:
+        import uvloop
+    except ImportError:     # optional [fast] extra; Windows keeps asyncio's loop
+        asyncio.run(coro)
+    else:
+        uvloop.run(coro)
 
 
 if __name__ == "__main__":
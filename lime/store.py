@@ -1,31 +1,212 @@
+import bisect
+import heapq
+import operator
+import sys
 import threading
-from typing import Callable
+import time
+from typing import Callable, Iterator
 
 from lime.message import Message
 
 
+def _new_thread(thread_id: str) -> dict:
+    return {
+        "thread_id": thread_id,
+        "title": "untitled",
+        "count": 0,
+        "latest": 0.0,
+        "preview": "",
+        "preview_author": "",
+    }
+
+
+def _thread_add(t: dict, msg: Message):
+    t["count"] += 1
+    if msg.thread_title:
+        t["title"] = msg.thread_title
+    if msg.timestamp > t["latest"]:
+        t["latest"] = msg.timestamp
+        t["preview"] = msg.content[:60]
+        t["preview_author"] = msg.display_author
+
+
+# Names are at most 20 characters and never contain spaces (see app.py).
+_MENTION_NAME_MAX = 20
+# Messages with more '@'s than this are substring-scanned, not indexed.
+_MENTION_TAGS_MAX = 16
+
+
+def _mention_keys(content: str) -> set[str] | None:
+    """Every name for which "@name" occurs in content; None if too many '@'s.
+
+    Matches the substring test exactly: each '@' yields all prefixes of
+    the up-to-20 non-space characters after it.
+    """
+    if content.count("@") > _MENTION_TAGS_MAX:
+        return None
+    keys = set()
+    i = content.find("@")
+    while i != -1:
+        run = content[i + 1:i + 1 + _MENTION_NAME_MAX]
+        end = run.find(" ")
+        if end != -1:
+            run = run[:end]
+        keys.update(run[:k] for k in range(1, len(run) + 1))
+        i = content.find("@", i + 1)
+    return keys
+
+
+def _intern(s):
+    # Peer-supplied fields are not guaranteed to be str.
+    return sys.intern(s) if type(s) is str else s
+
+
+def _remove_sorted(keys: list, key: tuple):
+    """Delete key from a sorted list, if it is there."""
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+def _remove_key(index: dict[str, list], name: str, key: tuple):
+    keys = index.get(name)
+    if not keys:
+        return
+    _remove_sorted(keys, key)
+    if not keys:
+        del index[name]
+
+
+class _RWLock:
+    """Many readers or one writer; a waiting writer holds off new readers."""
+    __slots__ = ("_cond", "_readers", "_writing", "_writers_waiting", "read", "write")
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+        self.read = _ReadSide(self)
+        self.write = _WriteSide(self)
+
+
+class _ReadSide:
+    __slots__ = ("_rw",)
+
+    def __init__(self, rw: _RWLock):
+        self._rw = rw
+
+    def __enter__(self):
+        rw = self._rw
+        with rw._cond:
+            while rw._writing or rw._writers_waiting:
+                rw._cond.wait()
+            rw._readers += 1
+
+    def __exit__(self, *exc):
+        rw = self._rw
+        with rw._cond:
+            rw._readers -= 1
+            if not rw._readers:
+                rw._cond.notify_all()
+
+
+class _WriteSide:
+    __slots__ = ("_rw",)
+
+    def __init__(self, rw: _RWLock):
+        self._rw = rw
+
+    def __enter__(self):
+        rw = self._rw
+        with rw._cond:
+            rw._writers_waiting += 1
+            while rw._writing or rw._readers:
+                rw._cond.wait()
+            rw._writers_waiting -= 1
+            rw._writing = True
+
+    def __exit__(self, *exc):
+        rw = self._rw
+        with rw._cond:
+            rw._writing = False
+            rw._cond.notify_all()
+
+
+# Readers prune at most this often; Network's prune loop sweeps the rest.
+READ_PRUNE_INTERVAL = 1.0
+
+_by_timestamp = operator.attrgetter("timestamp")
+_by_key = operator.attrgetter("timestamp", "id")     # index key order
+_by_latest = operator.itemgetter("latest")
+
+
+def _live(msgs: list[Message], now: float) -> list[Message]:
+    """Drop messages that expired since the last prune."""
+    return [m for m in msgs if now <= m.expires_at]
+
+
+def _due(heap: list[tuple[float, str]]) -> bool:
+    """Whether the soonest expiry has passed; safe to call without the lock."""
+    try:
+        return heap[0][0] < time.time()
+    except IndexError:
+        return False
+
+
 class MessageStore:
     def __init__(self):
         self._messages: dict[str, Message] = {}
         self._dms: dict[str, Message] = {}
-        self._lock = threading.Lock()
-        self._on_new: list[Callable[[Message], None]] = []
+        # Readers share the lock; add/prune take it exclusively.
+        self._lock = _RWLock()
+        self._r, self._w = self._lock.read, self._lock.write
+        # Replaced, never mutated, so add() iterates it without locking.
+        self._on_new: tuple[Callable[[Message], None], ...] = ()
         self._last_hash = "0" * 64
+        self._version = 0   # bumped whenever the live message set changes
+        self._reset_indexes()
+        # (expires_at, id) min-heaps, so pruning only touches expired entries.
+        self._expiry: list[tuple[float, str]] = []
+        self._dm_expiry: list[tuple[float, str]] = []
+        self._next_read_prune = 0.0
+        self._next_read_dm_prune = 0.0
+
+    # Single attribute reads are atomic under the GIL and take no lock.
+    # Multi-step reads prune under the write lock only when something has
+    # expired, at most once per READ_PRUNE_INTERVAL, then snapshot under
+    # the shared read lock; in between, message lists are filtered and
+    # thread summaries may lag by up to that interval.
+
+    @property
+    def version(self) -> int:
+        """Changes whenever a message is added or pruned; for caching views."""
+        return self._version
 
     @property
     def last_hash(self) -> str:
-        with self._lock:
-            return self._last_hash
+        return self._last_hash
 
     def add(self, msg: Message) -> bool:
         """Add a message. Returns True if it was new (not dup, not expired)."""
-        if msg.is_expired:
+        # Duplicates (most gossip) are turned away before the write lock;
+        # the check is repeated under it for racing adds of the same id.
+        # Non-finite times would never leave, and stall, the expiry heap.
+        if msg.id in self._messages or not msg.has_finite_times or msg.is_expired:
             return False
-        with self._lock:
+        with self._w:
             if msg.id in self._messages:
                 return False
+            # One shared string per board / thread: index lookups hit the
+            # identity fast path and each message stops carrying a copy.
+            msg.board = _intern(msg.board)
+            if msg.thread_id:
+                msg.thread_id = _intern(msg.thread_id)
             self._messages[msg.id] = msg
+            heapq.heappush(self._expiry, (msg.expires_at, msg.id))
+            self._index(msg)
             self._last_hash = msg.pow_hash
+            self._version += 1
         for cb in self._on_new:
             try:
                 cb(msg)
@@ -34,132 +215,305 @@ class MessageStore:
         return True
 
     def get_all(self) -> list[Message]:
-        with self._lock:
-            self._prune()
-            return sorted(self._messages.values(), key=lambda m: m.timestamp)
+        stale = self._prune_due()
+        with self._r:
+            msgs = self._messages
+            out = [msgs[mid] for _, mid in self._feed]
+        return _live(out, stale) if stale else out
 
     def get_by_board(self, board: str) -> list[Message]:
-        with self._lock:
-            self._prune()
-            return sorted(
-                [m for m in self._messages.values() if m.board == board],
-                key=lambda m: m.timestamp,
-            )
+        return self._range(self._by_board, board)
 
     def get_by_thread(self, thread_id: str) -> list[Message]:
-        with self._lock:
-            self._prune()
-            return sorted(
-                [m for m in self._messages.values() if m.thread_id == thread_id],
-                key=lambda m: m.timestamp,
-            )
-
-    def get_threads(self, board: str) -> list[dict]:
-        """Active threads in a board, sorted by latest activity (newest first)."""
-        with self._lock:
-            self._prune()
-            threads: dict[str, dict] = {}
-            for msg in self._messages.values():
-                if msg.board != board or not msg.thread_id:
-                    continue
-                tid = msg.thread_id
-                if tid not in threads:
-                    threads[tid] = {
-                        "thread_id": tid,
-                        "title": msg.thread_title or "untitled",
-                        "count": 0,
-                        "latest": 0.0,
-                        "preview": "",
-                        "preview_author": "",
-                    }
-                t = threads[tid]
-                t["count"] += 1
-                if msg.thread_title:
-                    t["title"] = msg.thread_title
-                if msg.timestamp > t["latest"]:
-                    t["latest"] = msg.timestamp
-                    t["preview"] = msg.content[:60]
-                    t["preview_author"] = msg.display_author
-            return sorted(threads.values(), key=lambda x: x["latest"], reverse=True)
+        return self._range(self._by_thread, thread_id)
+
+    # The iter_* variants materialize only the requested slice of an index:
+    # messages at or after `since` (a timestamp), and of those only the
+    # newest `limit`, in timestamp order.
+
+    def iter_by_board(self, board: str, since: float | None = None,
+                      limit: int | None = None) -> Iterator[Message]:
+        return iter(self._range(self._by_board, board, since, limit))
+
+    def iter_by_thread(self, thread_id: str, since: float | None = None,
+                       limit: int | None = None) -> Iterator[Message]:
+        return iter(self._range(self._by_thread, thread_id, since, limit))
+
+    def iter_board_chat(self, board: str, since: float | None = None,
+                        limit: int | None = None) -> Iterator[Message]:
+        return iter(self._range(self._board_chat, board, since, limit))
+
+    def _range(self, index: dict[str, list[tuple[float, str]]], name: str,
+               since: float | None = None, limit: int | None = None) -> list[Message]:
+        stale = self._prune_due()
+        with self._r:
+            keys = index.get(name, ())
+            lo = bisect.bisect_left(keys, (since,)) if since is not None else 0
+            if limit is not None:
+                lo = max(lo, len(keys) - limit)
+            msgs = self._messages
+            out = [msgs[keys[i][1]] for i in range(lo, len(keys))]
+        return _live(out, stale) if stale else out
+
+    def get_threads(self, board: str, limit: int | None = None) -> list[dict]:
+        """Active threads in a board, sorted by latest activity (newest first).
+
+        With a limit, only the newest `limit` threads. The rows are shared
+        with later calls until the board's threads change; treat as read-only.
+        """
+        self._prune_due()
+        with self._r:
+            threads = self._thread_cache.get(board)
+            if threads is None:
+                threads = sorted(
+                    (dict(t) for t in self._threads.get(board, {}).values()),
+                    key=_by_latest, reverse=True,
+                )
+                self._thread_cache[board] = threads
+        return threads[:limit]
+
+    def thread_count(self, board: str) -> int:
+        return len(self._threads.get(board, ()))
 
     def get_board_chat(self, board: str) -> list[Message]:
         """Board-level messages (no thread) — the general chat."""
-        with self._lock:
-            self._prune()
-            return sorted(
-                [m for m in self._messages.values() if m.board == board and not m.thread_id],
-                key=lambda m: m.timestamp,
-            )
+        return self._range(self._board_chat, board)
+
+    def get_file_messages(self, board: str) -> list[Message]:
+        """Board chat messages with an attached file, oldest first."""
+        return self._range(self._board_files, board)
 
     def get_boards(self) -> list[str]:
-        with self._lock:
-            boards = {m.board for m in self._messages.values() if not m.is_expired}
-        return sorted(boards) if boards else ["general"]
+        self._prune_due()
+        with self._r:
+            boards = self._boards_cache
+            if boards is None:
+                # Only boards with live messages have an index entry.
+                boards = self._boards_cache = sorted(self._by_board) or ["general"]
+        return list(boards)
 
     def get_mentions(self, name: str) -> list[Message]:
         tag = f"@{name}"
-        return [m for m in self.get_all() if tag in m.content]
+        if not name or " " in name or len(name) > _MENTION_NAME_MAX:
+            return [m for m in self.get_all() if tag in m.content]
+        stale = self._prune_due()
+        with self._r:
+            msgs = self._messages
+            keys = self._mentions.get(name, [])
+            scanned = [k for k in self._mention_scan if tag in msgs[k[1]].content]
+            if scanned:
+                keys = sorted(keys + scanned)
+            out = [msgs[mid] for _, mid in keys]
+        return _live(out, stale) if stale else out
 
     def add_dm(self, msg: Message) -> bool:
-        if msg.is_expired:
+        if not msg.has_finite_times or msg.is_expired:
             return False
-        with self._lock:
+        with self._w:
             if msg.id in self._dms:
                 return False
             self._dms[msg.id] = msg
+            heapq.heappush(self._dm_expiry, (msg.expires_at, msg.id))
         return True
 
     def get_dms(self, my_name: str) -> list[Message]:
-        with self._lock:
-            self._prune_dms()
-            return sorted(
-                [m for m in self._dms.values()
-                 if not m.is_expired],
-                key=lambda m: m.timestamp,
-            )
+        self._prune_dms_due()
+        with self._r:
+            snapshot = list(self._dms.values())
+        return sorted(_live(snapshot, time.time()), key=_by_timestamp)
 
     def get_dm_conversations(self, my_name: str) -> dict[str, list[Message]]:
-        with self._lock:
-            self._prune_dms()
-            convos: dict[str, list[Message]] = {}
-            for m in self._dms.values():
-                if m.is_expired:
-                    continue
-                peer = m.author_name if m.author_name != my_name else m.board
-                if peer not in convos:
-                    convos[peer] = []
-                convos[peer].append(m)
-            for v in convos.values():
-                v.sort(key=lambda m: m.timestamp)
-            return convos
+        self._prune_dms_due()
+        with self._r:
+            snapshot = list(self._dms.values())
+        convos: dict[str, list[Message]] = {}
+        for m in _live(snapshot, time.time()):
+            peer = m.author_name if m.author_name != my_name else m.board
+            if peer not in convos:
+                convos[peer] = []
+            convos[peer].append(m)
+        for v in convos.values():
+            v.sort(key=_by_timestamp)
+        return convos
 
     def _prune_dms(self) -> int:
-        expired = [mid for mid, m in self._dms.items() if m.is_expired]
-        for mid in expired:
-            del self._dms[mid]
-        return len(expired)
+        heap, now, n = self._dm_expiry, time.time(), 0
+        while heap and heap[0][0] < now:
+            _, mid = heapq.heappop(heap)
+            if self._dms.pop(mid, None) is not None:
+                n += 1
+        return n
 
     def dm_count(self) -> int:
-        with self._lock:
-            return len(self._dms)
+        return len(self._dms)
 
     def on_new_message(self, callback: Callable[[Message], None]):
-        self._on_new.append(callback)
+        self._on_new = (*self._on_new, callback)
 
     def count(self) -> int:
-        with self._lock:
-            return len(self._messages)
+        return len(self._messages)
 
     def has(self, msg_id: str) -> bool:
-        with self._lock:
-            return msg_id in self._messages
+        return msg_id in self._messages
 
     def prune(self) -> int:
-        with self._lock:
+        with self._w:
             return self._prune()
 
+    def _prune_due(self) -> float:
+        """Prune if due; returns the time to filter against if pruning was
+        deferred (so expired messages may remain), else 0.0."""
+        if not _due(self._expiry):
+            return 0.0
+        now = time.time()
+        if now < self._next_read_prune:
+            return now
+        self._next_read_prune = now + READ_PRUNE_INTERVAL
+        with self._w:
+            self._prune()
+        return 0.0
+
+    def _prune_dms_due(self):
+        now = time.time()
+        if now >= self._next_read_dm_prune and _due(self._dm_expiry):
+            self._next_read_dm_prune = now + READ_PRUNE_INTERVAL
+            with self._w:
+                self._prune_dms()
+
+    def _pop_expired(self) -> list[Message]:
+        heap, now, expired = self._expiry, time.time(), []
+        while heap and heap[0][0] < now:
+            _, mid = heapq.heappop(heap)
+            m = self._messages.get(mid)
+            if m is not None:
+                expired.append(m)
+        return expired
+
     def _prune(self) -> int:
-        expired = [mid for mid, m in self._messages.items() if m.is_expired]
-        for mid in expired:
-            del self._messages[mid]
+        expired = self._pop_expired()
+        if not expired:
+            return 0
+        if 2 * len(expired) > len(self._messages):
+            # Mass expiry (e.g. after a pause): one rebuild of the dict and
+            # indexes beats removing each key from every sorted list.
+            gone = {m.id for m in expired}
+            self._messages = {mid: m for mid, m in self._messages.items() if mid not in gone}
+            self._reindex()
+            self._version += 1
+            return len(expired)
+        stale_threads = set()
+        for m in expired:
+            del self._messages[m.id]
+            key = (m.timestamp, m.id)
+            _remove_sorted(self._feed, key)
+            _remove_key(self._by_board, m.board, key)
+            if m.board not in self._by_board:
+                self._boards_cache = None
+            if m.thread_id:
+                _remove_key(self._by_thread, m.thread_id, key)
+                self._thread_cache.pop(m.board, None)
+                if self._thread_drop(m):
+                    stale_threads.add((m.board, m.thread_id))
+            else:
+                _remove_key(self._board_chat, m.board, key)
+                if m.content_type == "file" and m.file_data:
+                    _remove_key(self._board_files, m.board, key)
+            names = _mention_keys(m.content)
+            if names is None:
+                _remove_sorted(self._mention_scan, key)
+            else:
+                for name in names:
+                    _remove_key(self._mentions, name, key)
+        for board, tid in stale_threads:
+            self._rebuild_thread(board, tid)
+        self._version += 1
         return len(expired)
+
+    def _reset_indexes(self):
+        # Secondary indexes, kept alongside _messages under the lock:
+        # (timestamp, id) keys sorted for the whole feed and per board /
+        # thread / board chat (the unthreaded part of a board), and
+        # per-board thread summaries as returned by get_threads.
+        self._feed: list[tuple[float, str]] = []
+        self._by_board: dict[str, list[tuple[float, str]]] = {}
+        self._by_thread: dict[str, list[tuple[float, str]]] = {}
+        self._board_chat: dict[str, list[tuple[float, str]]] = {}
+        # Board chat messages carrying a file, numbered by /save.
+        self._board_files: dict[str, list[tuple[float, str]]] = {}
+        self._threads: dict[str, dict[str, dict]] = {}
+        # Mentioned name -> (timestamp, id) keys, plus keys of messages too
+        # '@'-heavy to index, which get_mentions scans.
+        self._mentions: dict[str, list[tuple[float, str]]] = {}
+        self._mention_scan: list[tuple[float, str]] = []
+        # Sorted views, dropped by whatever write changes them.
+        self._boards_cache: list[str] | None = None
+        self._thread_cache: dict[str, list[dict]] = {}
+
+    def _reindex(self):
+        """Rebuild every index from the surviving messages.
+
+        In (timestamp, id) order each insort lands at the end of its list.
+        """
+        self._reset_indexes()
+        for m in sorted(self._messages.values(), key=_by_key):
+            self._index(m)
+
+    def _index(self, msg: Message):
+        key = (msg.timestamp, msg.id)
+        bisect.insort(self._feed, key)
+        if msg.board not in self._by_board:
+            self._boards_cache = None
+        bisect.insort(self._by_board.setdefault(msg.board, []), key)
+        if msg.thread_id:
+            bisect.insort(self._by_thread.setdefault(msg.thread_id, []), key)
+            self._thread_cache.pop(msg.board, None)
+            threads = self._threads.setdefault(msg.board, {})
+            t = threads.get(msg.thread_id)
+            if t is None:
+                t = threads[msg.thread_id] = _new_thread(msg.thread_id)
+            _thread_add(t, msg)
+        else:
+            bisect.insort(self._board_chat.setdefault(msg.board, []), key)
+            if msg.content_type == "file" and msg.file_data:
+                bisect.insort(self._board_files.setdefault(msg.board, []), key)
+        names = _mention_keys(msg.content)
+        if names is None:
+            bisect.insort(self._mention_scan, key)
+        else:
+            for name in names:
+                bisect.insort(self._mentions.setdefault(name, []), key)
+
+    def _thread_drop(self, m: Message) -> bool:
+        """Take an expired message out of its thread summary.
+
+        Returns True when the summary needs a rebuild: the message set the
+        title or the latest-activity fields.
+        """
+        threads = self._threads.get(m.board)
+        t = threads.get(m.thread_id) if threads else None
+        if t is None:
+            return False
+        t["count"] -= 1
+        if t["count"] <= 0:
+            del threads[m.thread_id]
+            if not threads:
+                del self._threads[m.board]
+            return False
+        return bool(m.thread_title) or m.timestamp >= t["latest"]
+
+    def _rebuild_thread(self, board: str, thread_id: str):
+        """Recompute one thread summary after some of its messages expired."""
+        threads = self._threads.get(board)
+        if threads is None:
+            return
+        t = _new_thread(thread_id)
+        for _, mid in self._by_thread.get(thread_id, ()):
+            m = self._messages[mid]
+            if m.board == board:
+                _thread_add(t, m)
+        if t["count"]:
+            threads[thread_id] = t
+        else:
+            threads.pop(thread_id, None)
+            if not threads:
+                del self._threads[board]
@@ -1,7 +1,13 @@
+import base64
 import curses
+import os
 import queue
+import select
+import sys
 import time
 import uuid
+from itertools import islice
+from pathlib import Path
 from typing import Callable, Optional
 
 from lime.art import ART_HEIGHT, ART_WIDTH, LIME_GRID, draw_lime
@@ -18,6 +24,72 @@ C_RED = 6
 C_YELLOW = 7
 
 
+class WakeQueue(queue.Queue):
+    """queue.Queue whose every put also makes wake_fd readable.
+
+    Lets the TUI sleep in select() on stdin and wake_fd instead of
+    polling the queue. Needs select() on pipes, so not for Windows.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize)
+        self.wake_fd, self._wake_w = os.pipe()
+        os.set_blocking(self.wake_fd, False)
+        os.set_blocking(self._wake_w, False)
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass    # pipe full: a wakeup is already pending
+
+
+def _content_runs(content: str) -> list[tuple[str, bool]]:
+    """Split content into (text, is_mention) runs.
+
+    A mention runs from "@" to the next space or the next "@".
+    """
+    if "@" not in content:
+        return [(content, False)] if content else []
+    runs = []
+    find = content.find
+    n = len(content)
+    pos = 0
+    while pos < n:
+        at = find("@", pos)
+        if at == -1:
+            at = n
+        if at > pos:
+            runs.append((content[pos:at], False))
+            pos = at
+            continue
+        end = find(" ", at + 1)
+        nxt = find("@", at + 1)
+        if end == -1 or (nxt != -1 and nxt < end):
+            end = n if nxt == -1 else nxt
+        runs.append((content[at:end], True))
+        pos = end
+    return runs
+
+
+def _clip_runs(runs: list[tuple[str, bool]], width: int) -> list[tuple[str, bool]]:
+    """runs cut to width - 1 chars plus "~" (width >= 2, text longer than width).
+
+    The "~" joins the run holding the last kept char, matching a re-scan
+    of the truncated text.
+    """
+    out = []
+    left = width - 1
+    for text, mention in runs:
+        if len(text) >= left:
+            out.append((text[:left] + "~", mention))
+            break
+        out.append((text, mention))
+        left -= len(text)
+    return out
+
+
 class LimeTUI:
     def __init__(
         self,
@@ -31,13 +103,18 @@ class LimeTUI:
     ):
         self.name = name
         self.tag = tag
+        self._mention_token = f"@{name}"
+        self._prompt = f" {name}#{tag} > "
         self.store = store
         self.ui_queue = ui_queue
         self.send_cb = send_cb
         self.connect_cb = connect_cb
         self.dm_cb = dm_cb
 
-        self.input_buf = ""
+        # Typed text as a list of characters, joined at most once a frame;
+        # see input_buf.
+        self._input_chars: list[str] = []
+        self._input_str: str | None = ""
         self.input_mode = False
         self.show_header = True
         self.mentions_only = False
@@ -62,6 +139,43 @@ class LimeTUI:
         self._tab_candidates: list[str] = []
         self._tab_index = -1
         self._tab_prefix = ""
+        # "name#tag" -> expiry of their newest message, in first-seen order;
+        # fed by message events so Tab never walks the store.
+        self._known_authors: dict[str, float] = {}
+        for m in store.get_all():
+            self._note_author(m)
+
+        # Command verb -> (handler, whether it takes arguments).
+        self._commands: dict[str, tuple[Callable[[str], None], bool]] = {
+            "/connect": (self._cmd_connect, True),
+            "/b": (self._cmd_board, True),
+            "/boards": (self._cmd_boards, False),
+            "/t": (self._cmd_new_thread, True),
+            "/threads": (self._cmd_threads, False),
+            "/dm": (self._cmd_dm, True),
+            "/help": (self._cmd_help, False),
+            "/back": (self._cmd_back, False),
+            "/reply": (self._cmd_reply, True),
+            "/file": (self._cmd_file, True),
+            "/save": (self._cmd_save, True),
+        }
+
+        # Per-region signature of what is on screen; see _region.
+        self._last_sig: dict[str, tuple] = {}
+        # Left half of the status bar outside of tips and flashes, and the
+        # state it was built from.
+        self._status_left_key: tuple = ()
+        self._status_left = ""
+        # The whole line and its inputs; _flash_left is " <status_msg>".
+        self._status_key: tuple = ()
+        self._status = ""
+        self._flash_left = ""
+        # Store lookups shared by everything drawn in one frame.
+        self._frame_cache: dict = {}
+        # The rule under the header, rebuilt when the width changes.
+        self._dashes = ""
+        # Message id -> (flattened content, mention runs); see _msg_runs.
+        self._render_cache: dict[str, tuple[str, list[tuple[str, bool]]]] = {}
 
     # ------------------------------------------------------------------
     # Entry
@@ -70,7 +184,13 @@ class LimeTUI:
     def run(self, stdscr):
         self._scr = stdscr
         curses.curs_set(0)
-        curses.halfdelay(2)
+        # With a WakeQueue, block in select() until a key or event arrives;
+        # otherwise poll the queue every 200ms.
+        wake_fd = getattr(self.ui_queue, "wake_fd", None)
+        if wake_fd is None:
+            curses.halfdelay(2)
+        else:
+            stdscr.nodelay(True)
         stdscr.clear()
         self._setup_colors()
 
@@ -80,16 +200,59 @@ class LimeTUI:
             key = stdscr.getch()
             if key == curses.KEY_RESIZE:
                 stdscr.clear()
+                self._last_sig.clear()
                 continue
             if key == -1:
+                if wake_fd is not None:
+                    self._wait(wake_fd)
                 continue
             if self.input_mode:
                 if self._key_input(key):
                     break
+                # Take the rest of a paste before redrawing.
+                if wake_fd is not None:
+                    while self.input_mode:
+                        key = stdscr.getch()
+                        if key == -1:
+                            break
+                        if key == curses.KEY_RESIZE:
+                            curses.ungetch(key)
+                            break
+                        if self._key_input(key):
+                            return
             else:
                 if self._key_feed(key):
                     break
 
+    @property
+    def input_buf(self) -> str:
+        if self._input_str is None:
+            self._input_str = "".join(self._input_chars)
+        return self._input_str
+
+    @input_buf.setter
+    def input_buf(self, text: str):
+        self._input_chars = list(text)
+        self._input_str = text
+
+    def _wait(self, wake_fd: int):
+        """Sleep until input, a queued UI event, or the next whole second.
+
+        The second tick keeps countdowns and ages current. getch() is only
+        reached with curses' input buffer empty, so select() on stdin
+        cannot miss buffered keys.
+        """
+        try:
+            ready, _, _ = select.select(
+                (sys.stdin.fileno(), wake_fd), (), (), 1.0 - time.time() % 1.0)
+        except (OSError, ValueError):
+            return
+        if wake_fd in ready:
+            try:
+                os.read(wake_fd, 4096)
+            except OSError:
+                pass
+
     # ------------------------------------------------------------------
     # Key handling — feed mode
     # ------------------------------------------------------------------
@@ -176,6 +339,11 @@ class LimeTUI:
         "/reply ", "/connect ", "/dm ", "/file ", "/save ",
         "/help", "@",
     ]
+    # The same list bucketed by first character, order preserved.
+    _COMPLETIONS_BY_CHAR: dict[str, list[str]] = {}
+    for _c in _COMPLETIONS:
+        _COMPLETIONS_BY_CHAR.setdefault(_c[0], []).append(_c)
+    del _c
 
     def _key_input(self, key) -> bool:
         if key == 27:
@@ -186,7 +354,9 @@ class LimeTUI:
             self._submit_input()
             return False
         if key in (curses.KEY_BACKSPACE, 127, 8):
-            self.input_buf = self.input_buf[:-1]
+            if self._input_chars:
+                self._input_chars.pop()
+                self._input_str = None
             self._tab_reset()
             return False
         if key == 3:
@@ -196,7 +366,8 @@ class LimeTUI:
             self._tab_complete()
             return False
         if 32 <= key <= 126:
-            self.input_buf += chr(key)
+            self._input_chars.append(chr(key))
+            self._input_str = None
             self._tab_reset()
         return False
 
@@ -213,7 +384,11 @@ class LimeTUI:
             self._tab_complete_mention(prefix)
             return
 
-        matches = [c for c in self._COMPLETIONS if c.startswith(prefix)]
+        if not prefix:
+            matches = list(self._COMPLETIONS)
+        else:
+            bucket = self._COMPLETIONS_BY_CHAR.get(prefix[0], ())
+            matches = [c for c in bucket if c.startswith(prefix)]
         if not matches:
             return
         self._tab_prefix = prefix
@@ -223,15 +398,12 @@ class LimeTUI:
 
     def _tab_complete_mention(self, prefix: str):
         partial = prefix[1:].lower()
-        msgs = self.store.get_all()
-        seen: set[str] = set()
-        names: list[str] = []
-        for m in msgs:
-            author = m.display_author
-            if author not in seen:
-                seen.add(author)
-                if not partial or author.lower().startswith(partial):
-                    names.append(f"@{author} ")
+        now = time.time()
+        # Authors whose messages have all expired are dropped for good.
+        live = self._known_authors = {
+            a: exp for a, exp in self._known_authors.items() if now <= exp
+        }
+        names = [f"@{a} " for a in live if not partial or a.lower().startswith(partial)]
         if not names:
             return
         self._tab_prefix = prefix
@@ -239,6 +411,11 @@ class LimeTUI:
         self._tab_index = 0
         self.input_buf = names[0]
 
+    def _note_author(self, msg: Message):
+        author = msg.display_author
+        if self._known_authors.get(author, 0.0) < msg.expires_at:
+            self._known_authors[author] = msg.expires_at
+
     def _tab_reset(self):
         self._tab_candidates = []
         self._tab_index = -1
@@ -252,135 +429,132 @@ class LimeTUI:
         if not text:
             return
 
-        # /connect
-        if text.startswith("/connect "):
-            addr = text[9:].strip()
-            if ":" in addr:
-                host, port_s = addr.rsplit(":", 1)
-                try:
-                    self.connect_cb(host, int(port_s))
-                    self._flash(f"connecting to {addr}...")
-                except ValueError:
-                    self._flash("bad port")
-            return
-
-        # /b [board] — switch board
-        if text.startswith("/b "):
-            board_name = text[3:].strip().lower().replace("/", "")
-            if not board_name:
-                self._flash("usage: /b [board]")
+        # "/verb args" for commands that take arguments, the bare "/verb" for
+        # those that don't; anything else is sent as a message.
+        if text[0] == "/":
+            head, sep, rest = text.partition(" ")
+            cmd = self._commands.get(head)
+            if cmd is not None and bool(sep) == cmd[1]:
+                cmd[0](rest)
                 return
-            self.current_board = board_name
-            self.current_thread_id = ""
-            self.current_thread_title = ""
-            self.show_thread_list = False
-            self.scroll_offset = 0
-            self._flash(f"switched to /{board_name}/")
-            return
 
-        # /boards — list boards
-        if text == "/boards":
-            boards = self.store.get_boards()
-            self._flash("boards: " + " ".join(f"/{b}/" for b in boards))
-            return
+        # Regular message — board-level chat or inside a thread
+        ct = "code" if text.startswith("```") else "text"
+        if ct == "code":
+            text = text.strip("`").strip()
 
-        # /t [title] — create a new thread
-        if text.startswith("/t "):
-            title = text[3:].strip()
-            if not title:
-                self._flash("usage: /t [title]")
-                return
-            tid = f"t_{uuid.uuid4().hex[:6]}"
-            self.send_cb(title, "text", self.current_board, tid, title, "")
-            self.current_thread_id = tid
-            self.current_thread_title = title
-            self.show_thread_list = False
-            self.scroll_offset = 0
-            self.mining = True
-            return
+        self.send_cb(text, ct, self.current_board, self.current_thread_id, "", "")
+        self.mining = True
 
-        # /threads — list threads
-        if text == "/threads":
-            self.show_thread_list = True
-            self.scroll_offset = 0
-            return
+    # /connect host:port
+    def _cmd_connect(self, rest: str):
+        addr = rest.strip()
+        if ":" in addr:
+            host, port_s = addr.rsplit(":", 1)
+            try:
+                self.connect_cb(host, int(port_s))
+                self._flash(f"connecting to {addr}...")
+            except ValueError:
+                self._flash("bad port")
 
-        # /dm @name message — send a DM
-        if text.startswith("/dm "):
-            parts = text[4:].strip().split(" ", 1)
-            if len(parts) < 2:
-                self._flash("usage: /dm @name message")
-                return
-            target = parts[0].lstrip("@")
-            message = parts[1]
-            if self.dm_cb:
-                self.dm_cb(message, target)
-                self._flash(f"dm sent to {target}")
-            else:
-                self._flash("DMs not available")
+    # /b [board] — switch board
+    def _cmd_board(self, rest: str):
+        board_name = rest.strip().lower().replace("/", "")
+        if not board_name:
+            self._flash("usage: /b [board]")
             return
-
-        # /help — show help overlay
-        if text == "/help":
-            self.show_help = True
-            self.scroll_offset = 0
+        self.current_board = board_name
+        self.current_thread_id = ""
+        self.current_thread_title = ""
+        self.show_thread_list = False
+        self.scroll_offset = 0
+        self._flash(f"switched to /{board_name}/")
+
+    # /boards — list boards
+    def _cmd_boards(self, rest: str):
+        boards = self.store.get_boards()
+        self._flash("boards: " + " ".join(f"/{b}/" for b in boards))
+
+    # /t [title] — create a new thread
+    def _cmd_new_thread(self, rest: str):
+        title = rest.strip()
+        if not title:
+            self._flash("usage: /t [title]")
             return
+        tid = f"t_{uuid.uuid4().hex[:6]}"
+        self.send_cb(title, "text", self.current_board, tid, title, "")
+        self.current_thread_id = tid
+        self.current_thread_title = title
+        self.show_thread_list = False
+        self.scroll_offset = 0
+        self.mining = True
 
-        # /back — return to board chat
-        if text == "/back":
-            self.current_thread_id = ""
-            self.current_thread_title = ""
-            self.show_thread_list = False
-            self.show_help = False
-            self.show_dms = False
-            self.scroll_offset = 0
-            return
+    # /threads — list threads
+    def _cmd_threads(self, rest: str):
+        self.show_thread_list = True
+        self.scroll_offset = 0
 
-        # /reply [#] [message] — post into a thread by number
-        if text.startswith("/reply "):
-            parts = text[7:].strip().split(" ", 1)
-            if len(parts) < 2:
-                self._flash("usage: /reply [#] [message]")
-                return
-            try:
-                thread_num = int(parts[0])
-                message = parts[1]
-            except ValueError:
-                self._flash("usage: /reply [#] [message]")
-                return
-            threads = self.store.get_threads(self.current_board)
-            if thread_num < 1 or thread_num > len(threads):
-                self._flash(f"thread #{thread_num} not found")
-                return
-            t = threads[thread_num - 1]
-            self.send_cb(message, "text", self.current_board, t["thread_id"], "", "")
-            self.mining = True
+    # /dm @name message — send a DM
+    def _cmd_dm(self, rest: str):
+        parts = rest.strip().split(" ", 1)
+        if len(parts) < 2:
+            self._flash("usage: /dm @name message")
             return
+        target = parts[0].lstrip("@")
+        message = parts[1]
+        if self.dm_cb:
+            self.dm_cb(message, target)
+            self._flash(f"dm sent to {target}")
+        else:
+            self._flash("DMs not available")
 
-        # /file path — share a file
-        if text.startswith("/file "):
-            filepath = text[6:].strip()
-            self._send_file(filepath)
-            return
+    # /help — show help overlay
+    def _cmd_help(self, rest: str):
+        self.show_help = True
+        self.scroll_offset = 0
 
-        # /save # [path] — save a received file
-        if text.startswith("/save "):
-            parts = text[6:].strip().split(" ", 1)
-            try:
-                idx = int(parts[0].lstrip("#")) - 1
-                dest = parts[1] if len(parts) > 1 else ""
-                self._save_file(idx, dest)
-            except (ValueError, IndexError):
-                self._flash("usage: /save #num [path]")
+    # /back — return to board chat
+    def _cmd_back(self, rest: str):
+        self.current_thread_id = ""
+        self.current_thread_title = ""
+        self.show_thread_list = False
+        self.show_help = False
+        self.show_dms = False
+        self.scroll_offset = 0
+
+    # /reply [#] [message] — post into a thread by number
+    def _cmd_reply(self, rest: str):
+        parts = rest.strip().split(" ", 1)
+        if len(parts) < 2:
+            self._flash("usage: /reply [#] [message]")
             return
+        try:
+            thread_num = int(parts[0])
+            message = parts[1]
+        except ValueError:
+            self._flash("usage: /reply [#] [message]")
+            return
+        threads = self.store.get_threads(self.current_board)
+        if thread_num < 1 or thread_num > len(threads):
+            self._flash(f"thread #{thread_num} not found")
+            return
+        t = threads[thread_num - 1]
+        self.send_cb(message, "text", self.current_board, t["thread_id"], "", "")
+        self.mining = True
 
-        # Regular message — board-level chat or inside a thread
-        ct = "code" if text.startswith("```") else "text"
-        if ct == "code":
-            text = text.strip("`").strip()
+    # /file path — share a file
+    def _cmd_file(self, rest: str):
+        self._send_file(rest.strip())
 
-        self.send_cb(text, ct, self.current_board, self.current_thread_id, "", "")
-        self.mining = True
+    # /save # [path] — save a received file
+    def _cmd_save(self, rest: str):
+        parts = rest.strip().split(" ", 1)
+        try:
+            idx = int(parts[0].lstrip("#")) - 1
+            dest = parts[1] if len(parts) > 1 else ""
+            self._save_file(idx, dest)
+        except (ValueError, IndexError):
+            self._flash("usage: /save #num [path]")
 
     def _cancel_input(self):
         self.input_buf = ""
@@ -389,6 +563,7 @@ class LimeTUI:
 
     def _flash(self, msg: str, seconds: float = 4.0):
         self.status_msg = msg
+        self._flash_left = f" {msg}"
         self.status_expire = time.time() + seconds
 
     # ------------------------------------------------------------------
@@ -396,19 +571,25 @@ class LimeTUI:
     # ------------------------------------------------------------------
 
     def _drain_events(self):
-        while True:
+        q = self.ui_queue
+        get = q.get_nowait
+        # qsize() first so an idle frame never raises queue.Empty.
+        while q.qsize():
             try:
-                ev = self.ui_queue.get_nowait()
+                ev = get()
             except queue.Empty:
                 break
             kind = ev[0]
             if kind == "new_msg":
                 msg: Message = ev[1]
-                if f"@{self.name}" in msg.content and msg.author_name != self.name:
+                self._note_author(msg)
+                if self._mention_token in msg.content and msg.author_name != self.name:
                     self.mention_count += 1
                     curses.beep()
                 self.mining = False
             elif kind == "msg_sent":
+                if ev[1] is not None:
+                    self._note_author(ev[1])
                 self.mining = False
             elif kind == "new_dm":
                 dm_msg: Message = ev[1]
@@ -437,22 +618,89 @@ class LimeTUI:
     # ------------------------------------------------------------------
 
     def _draw(self):
+        H, W = self._scr.getmaxyx()
+        row = ART_HEIGHT + 6 if self.show_header else 1
+        feed_bottom = H - 3
+        clock = self._main_clock(row + 1, feed_bottom)
+
+        changed = self._region(
+            "header", (W, self.show_header, self.current_board, self.current_thread_id,
+                       self.current_thread_title),
+            0, row + 1, self._draw_top, row, W,
+        )
+        changed |= self._region(
+            "main", (W, H, row, self.show_help, self.show_dms, self.mentions_only,
+                     self.current_thread_id, self.show_thread_list, self.current_board,
+                     self.scroll_offset, self.store.version, self.store.dm_count(), clock),
+            row + 1, feed_bottom, self._draw_main, row + 1, feed_bottom, W,
+        )
+        changed |= self._region(
+            "input", (W, self.input_mode, self.input_buf, self.mining, self.show_help,
+                      self.show_dms, self.current_thread_id, self.show_thread_list),
+            H - 2, H - 1, self._draw_input, H - 2, W,
+        )
+        status = self._status_line(W)
+        changed |= self._region("status", (status,), H - 1, H, self._draw_status, H - 1, status)
+
+        self._frame_cache.clear()
+        if changed:
+            self._scr.refresh()
+
+    def _main_clock(self, top: int, bottom: int):
+        """The time-dependent part of the main area's signature.
+
+        A feed only changes with its rows' countdown labels, which tick
+        once a minute until the last minute; other views show ages and
+        redraw each second.
+        """
+        if self.show_help:
+            return None
+        if self.show_dms:
+            return int(time.time())
+        if self.mentions_only:
+            rows = self._feed_rows(top, bottom)
+        elif self.current_thread_id:
+            rows = self._feed_rows(top + 1, bottom)
+        elif self.show_thread_list:
+            return int(time.time())
+        else:
+            rows = self._feed_rows(top, bottom)
+        return tuple([(m.id, m.remaining_display) for m in rows])
+
+    def _cached(self, key, fn, *args):
+        """fn(*args), computed at most once per frame."""
+        cache = self._frame_cache
+        if key not in cache:
+            cache[key] = fn(*args)
+        return cache[key]
+
+    def _region(self, name: str, sig: tuple, top: int, bottom: int, draw, *args) -> bool:
+        """Repaint rows [top, bottom) with draw(*args) only if sig changed.
+
+        Unchanged regions keep their cells, so an idle frame issues no
+        addstr calls at all.
+        """
+        if self._last_sig.get(name) == sig:
+            return False
+        self._last_sig[name] = sig
         scr = self._scr
-        scr.erase()
-        H, W = scr.getmaxyx()
-        row = 0
+        for r in range(top, bottom):
+            try:
+                scr.move(r, 0)
+                scr.clrtoeol()
+            except curses.error:
+                pass
+        draw(*args)
+        return True
 
+    def _draw_top(self, row: int, W: int):
         if self.show_header:
-            row = self._draw_header(row, W)
+            self._draw_header(0, W)
         else:
             self._draw_board_path(0, W)
-            row = 1
-
         self._hline(row, W)
-        row += 1
-
-        feed_bottom = H - 3
 
+    def _draw_main(self, row: int, feed_bottom: int, W: int):
         if self.show_help:
             self._draw_help(row, feed_bottom, W)
         elif self.show_dms:
@@ -467,21 +715,16 @@ class LimeTUI:
         else:
             self._draw_feed(row, feed_bottom, W)
 
-        self._draw_input(H - 2, W)
-        self._draw_status(H - 1, W)
-
-        scr.refresh()
-
     # -- header --------------------------------------------------------
 
     def _draw_header(self, start: int, W: int) -> int:
         art_x = max(0, (W - ART_WIDTH) // 2)
         draw_lime(self._scr, start + 1, art_x)
         ty = start + ART_HEIGHT + 2
-        self._centered(ty, "L I M E S", curses.color_pair(C_GREEN) | curses.A_BOLD)
+        self._centered(ty, "L I M E S", self._a_green_bold, W)
         self._centered(ty + 1, "anonymous ephemeral broadcast network",
-                        curses.color_pair(C_DIM) | curses.A_DIM)
-        self._centered(ty + 2, f"v{VERSION}", curses.color_pair(C_DIM))
+                        self._a_faint, W)
+        self._centered(ty + 2, f"v{VERSION}", self._a_dim, W)
         return ty + 4
 
     def _draw_board_path(self, row: int, W: int):
@@ -491,8 +734,8 @@ class LimeTUI:
             path += f" > {title_trunc}"
         version = f"limes v{VERSION}"
         try:
-            self._scr.addstr(row, 0, path, curses.color_pair(C_GREEN) | curses.A_BOLD)
-            self._scr.addstr(row, W - len(version) - 1, version, curses.color_pair(C_DIM))
+            self._scr.addstr(row, 0, path, self._a_green_bold)
+            self._scr.addstr(row, W - len(version) - 1, version, self._a_dim)
         except curses.error:
             pass
 
@@ -500,34 +743,36 @@ class LimeTUI:
         title = self.current_thread_title[:W - 6]
         try:
             self._scr.addstr(row, 1, f"> {title}",
-                             curses.color_pair(C_CYAN) | curses.A_BOLD)
+                             self._a_cyan_bold)
         except curses.error:
             pass
 
     # -- thread list ---------------------------------------------------
 
     def _draw_thread_list(self, top: int, bottom: int, W: int):
-        threads = self.store.get_threads(self.current_board)
         avail = bottom - top
         if avail <= 0:
             return
+        # Two rows per thread below the header: fetch only what fits.
+        threads = self.store.get_threads(self.current_board, limit=max(1, (avail - 1) // 2))
 
         try:
             self._scr.addstr(top, 1, f"/{self.current_board}/ threads  [q] back to chat",
-                             curses.color_pair(C_DIM) | curses.A_DIM)
+                             self._a_faint)
         except curses.error:
             pass
 
         if not threads:
             try:
                 self._scr.addstr(top + 2, 2, "no active threads",
-                                 curses.color_pair(C_DIM))
+                                 self._a_dim)
                 self._scr.addstr(top + 3, 2, "use /t [title] to create one",
-                                 curses.color_pair(C_DIM) | curses.A_DIM)
+                                 self._a_faint)
             except curses.error:
                 pass
             return
 
+        now = time.time()
         for i, t in enumerate(threads):
             row_base = top + 1 + (i * 2)
             if row_base + 1 >= bottom:
@@ -538,19 +783,19 @@ class LimeTUI:
             if len(title) > 35:
                 title = title[:34] + "~"
             count = f"{t['count']}"
-            age = self._format_age(t["latest"])
+            age = self._format_age(t["latest"], now)
 
             try:
                 self._scr.addstr(row_base, 0, num,
-                                 curses.color_pair(C_CYAN) | curses.A_BOLD)
+                                 self._a_cyan_bold)
                 col = len(num)
                 self._scr.addstr(row_base, col, title,
-                                 curses.color_pair(C_GREEN) | curses.A_BOLD)
+                                 self._a_green_bold)
                 info = f" {count} msgs  {age}"
                 info_x = W - len(info) - 1
                 if info_x > col + len(title):
                     self._scr.addstr(row_base, info_x, info,
-                                     curses.color_pair(C_DIM))
+                                     self._a_dim)
             except curses.error:
                 pass
 
@@ -562,23 +807,34 @@ class LimeTUI:
                     line = line[:W - 3] + "~"
                 try:
                     self._scr.addstr(row_base + 1, 0, line,
-                                     curses.color_pair(C_DIM) | curses.A_DIM)
+                                     self._a_faint)
                 except curses.error:
                     pass
 
     # -- message feed --------------------------------------------------
 
     def _draw_feed(self, top: int, bottom: int, W: int):
+        draw_msg = self._draw_msg
+        for r, msg in enumerate(self._feed_rows(top, bottom), top):
+            draw_msg(r, W, msg)
+
+    def _feed_rows(self, top: int, bottom: int) -> list[Message]:
+        """Messages shown in feed rows [top, bottom); clamps scroll_offset."""
+        return self._cached(("feed_rows", top, bottom), self._visible_msgs, bottom - top)
+
+    def _visible_msgs(self, avail: int) -> list[Message]:
+        if avail <= 0:
+            return []
+
+        # Only the newest screenful plus the scrollback offset is fetched;
+        # a short result is the whole feed, so the offset clamp below holds.
+        want = avail + self.scroll_offset
         if self.mentions_only:
             msgs = self.store.get_mentions(self.name)
         elif self.current_thread_id:
-            msgs = self.store.get_by_thread(self.current_thread_id)
+            msgs = list(self.store.iter_by_thread(self.current_thread_id, limit=want))
         else:
-            msgs = self.store.get_board_chat(self.current_board)
-
-        avail = bottom - top
-        if avail <= 0:
-            return
+            msgs = list(self.store.iter_board_chat(self.current_board, limit=want))
 
         total = len(msgs)
         max_off = max(0, total - avail)
@@ -587,144 +843,156 @@ class LimeTUI:
 
         start_idx = max(0, total - avail - self.scroll_offset)
         end_idx = min(total, start_idx + avail)
-
-        for i, msg in enumerate(msgs[start_idx:end_idx]):
-            r = top + i
-            if r >= bottom:
-                break
-            self._draw_msg(r, W, msg)
+        if start_idx == 0 and end_idx == total:
+            return msgs     # the usual case: the fetch was exactly one screen
+        return msgs[start_idx:end_idx]
+
+    def _msg_runs(self, msg: Message) -> tuple[str, list[tuple[str, bool]]]:
+        """Flattened content and its mention runs, computed once per message."""
+        cache = self._render_cache
+        hit = cache.get(msg.id)
+        if hit is None:
+            if len(cache) > 2 * self.store.count() + 256:
+                has = self.store.has
+                self._render_cache = cache = {k: v for k, v in cache.items() if has(k)}
+            flat = msg.content.replace("\n", " ")
+            hit = cache[msg.id] = (flat, _content_runs(flat))
+        return hit
 
     def _draw_msg(self, row: int, W: int, msg: Message):
         scr = self._scr
-        author = msg.display_author
-        prefix = f" {author}: "
-        remaining = f" {msg.remaining_display} "
+        prefix = f" {msg.author_name}#{msg.author_tag}: "
+        secs = msg.remaining_seconds
+        remaining = f" {secs // 60}m " if secs >= 60 else f" {secs}s "
         max_content = W - len(prefix) - len(remaining) - 1
         if msg.content_type == "file" and msg.file_name:
             kb = msg.file_size // 1024
             content = f"[file: {msg.file_name} ({kb}KB)] /save #{self._file_index(msg)}"
+            if len(content) > max_content:
+                content = content[: max_content - 1] + "~"
+            runs = _content_runs(content)
         else:
-            content = msg.content.replace("\n", " ")
-        if len(content) > max_content:
-            content = content[: max_content - 1] + "~"
+            flat, runs = self._msg_runs(msg)
+            if len(flat) > max_content:
+                if max_content >= 2:
+                    runs = _clip_runs(runs, max_content)
+                else:
+                    runs = _content_runs(flat[: max_content - 1] + "~")
 
         try:
-            scr.addstr(row, 0, prefix, curses.color_pair(C_GREEN) | curses.A_BOLD)
+            scr.addstr(row, 0, prefix, self._a_green_bold)
             col = len(prefix)
-            self._render_content(row, col, content, W - len(remaining) - 1)
-            time_attr = curses.color_pair(C_DIM) | curses.A_DIM
-            if msg.remaining_seconds < 120:
-                time_attr = curses.color_pair(C_RED) | curses.A_BOLD
+            self._render_runs(row, col, runs, W - len(remaining) - 1)
+            time_attr = self._a_red_bold if secs < 120 else self._a_faint
             scr.addstr(row, W - len(remaining) - 1, remaining, time_attr)
         except curses.error:
             pass
 
-    def _render_content(self, row: int, col: int, content: str, max_col: int):
+    def _render_runs(self, row: int, col: int, runs: list[tuple[str, bool]], max_col: int):
+        """Dim text with bold-cyan @mentions; one addstr per run."""
         scr = self._scr
-        parts = content.split("@")
-        for j, part in enumerate(parts):
+        dim = self._a_dim
+        cyan = self._a_cyan_bold
+        for text, mention in runs:
             if col >= max_col:
                 break
-            if j == 0:
-                seg = part[: max_col - col]
-                try:
-                    scr.addstr(row, col, seg, curses.color_pair(C_DIM))
-                except curses.error:
-                    pass
-                col += len(seg)
-            else:
-                space = part.find(" ")
-                if space == -1:
-                    mention, rest = part, ""
-                else:
-                    mention, rest = part[:space], part[space:]
-                m_text = f"@{mention}"[: max_col - col]
-                try:
-                    scr.addstr(row, col, m_text, curses.color_pair(C_CYAN) | curses.A_BOLD)
-                except curses.error:
-                    pass
-                col += len(m_text)
-                if rest and col < max_col:
-                    r_text = rest[: max_col - col]
-                    try:
-                        scr.addstr(row, col, r_text, curses.color_pair(C_DIM))
-                    except curses.error:
-                        pass
-                    col += len(r_text)
+            seg = text[: max_col - col]
+            try:
+                scr.addstr(row, col, seg, cyan if mention else dim)
+            except curses.error:
+                pass
+            col += len(seg)
 
     # -- input line ----------------------------------------------------
 
+    _HINT_HELP = "[?] close help  [q] quit"
+    _HINT_DMS = "[i] type  [d] back to chat"
+    _HINT_THREAD = "[i] type  [q] back to chat"
+    _HINT_THREADLIST = "[1-9] enter thread  [q] back"
+    _HINT_DEFAULT = "[i] type  [t] threads  [d] DMs  [?] help"
+
     def _draw_input(self, row: int, W: int):
         scr = self._scr
-        prompt = f" {self.name}#{self.tag} > "
-        if self.mining:
-            prompt = " mining... "
+        prompt = " mining... " if self.mining else self._prompt
         try:
             if self.input_mode:
-                scr.addstr(row, 0, prompt, curses.color_pair(C_GREEN))
+                scr.addstr(row, 0, prompt, self._a_green)
                 buf_space = W - len(prompt) - 1
                 visible = self.input_buf[-buf_space:] if len(self.input_buf) > buf_space else self.input_buf
-                scr.addstr(row, len(prompt), visible, curses.color_pair(C_DIM))
+                scr.addstr(row, len(prompt), visible, self._a_dim)
             else:
-                scr.addstr(row, 0, prompt, curses.color_pair(C_DIM) | curses.A_DIM)
+                scr.addstr(row, 0, prompt, self._a_faint)
                 if self.show_help:
-                    hint = "[?] close help  [q] quit"
+                    hint = self._HINT_HELP
                 elif self.show_dms:
-                    hint = "[i] type  [d] back to chat"
+                    hint = self._HINT_DMS
                 elif self.current_thread_id:
-                    hint = "[i] type  [q] back to chat"
+                    hint = self._HINT_THREAD
                 elif self.show_thread_list:
-                    hint = "[1-9] enter thread  [q] back"
+                    hint = self._HINT_THREADLIST
                 else:
-                    hint = "[i] type  [t] threads  [d] DMs  [?] help"
+                    hint = self._HINT_DEFAULT
                 scr.addstr(row, len(prompt), hint,
-                           curses.color_pair(C_DIM) | curses.A_DIM)
+                           self._a_faint)
         except curses.error:
             pass
 
     # -- status bar ----------------------------------------------------
 
-    def _draw_status(self, row: int, W: int):
+    def _status_line(self, W: int) -> str:
         if self.first_run_tip and not self.status_msg:
             left = " tip: press [i] to type, [t] threads, [d] DMs, [?] help"
         elif self.status_msg and time.time() < self.status_expire:
-            left = f" {self.status_msg}"
+            left = self._flash_left
         else:
-            board_path = f"/{self.current_board}/"
-            if self.current_thread_id:
-                tt = self.current_thread_title[:15]
-                board_path += f" > {tt}"
-            thread_count = len(self.store.get_threads(self.current_board))
-            threads_info = f" {thread_count}t" if thread_count and not self.current_thread_id else ""
-            mode = " [mentions]" if self.mentions_only else ""
-            dm_info = f" dm({self.dm_count_unread})" if self.dm_count_unread else ""
-            left = f" {board_path}{threads_info} [n]otif({self.mention_count}){dm_info}{mode}"
-
-        relay = " relay:on" if self.relay_connected else ""
-        e2e = " e2e:on" if self.e2e_active else ""
-        right = f"peers:{self.peer_count} msgs:{self.store.count()}{relay}{e2e} "
-        pad = W - len(left) - len(right)
-        line = left + (" " * max(0, pad)) + right
+            thread_count = 0 if self.current_thread_id else self.store.thread_count(self.current_board)
+            key = (self.current_board, self.current_thread_id, self.current_thread_title,
+                   thread_count, self.mention_count, self.dm_count_unread, self.mentions_only)
+            if key != self._status_left_key:
+                self._status_left_key = key
+                self._status_left = self._board_status(thread_count)
+            left = self._status_left
+
+        key = (W, left, self.peer_count, self.store.count(), self.relay_connected, self.e2e_active)
+        if key != self._status_key:
+            self._status_key = key
+            relay = " relay:on" if self.relay_connected else ""
+            e2e = " e2e:on" if self.e2e_active else ""
+            right = f"peers:{self.peer_count} msgs:{key[3]}{relay}{e2e} "
+            pad = W - len(left) - len(right)
+            line = left + (" " * max(0, pad)) + right
+            self._status = line[: W - 1]
+        return self._status
+
+    def _board_status(self, thread_count: int) -> str:
+        board_path = f"/{self.current_board}/"
+        if self.current_thread_id:
+            tt = self.current_thread_title[:15]
+            board_path += f" > {tt}"
+        threads_info = f" {thread_count}t" if thread_count else ""
+        mode = " [mentions]" if self.mentions_only else ""
+        dm_info = f" dm({self.dm_count_unread})" if self.dm_count_unread else ""
+        return f" {board_path}{threads_info} [n]otif({self.mention_count}){dm_info}{mode}"
+
+    def _draw_status(self, row: int, line: str):
         try:
-            self._scr.addstr(row, 0, line[: W - 1], curses.A_REVERSE)
+            self._scr.addstr(row, 0, line, curses.A_REVERSE)
         except curses.error:
             pass
 
     def _file_index(self, msg: Message) -> int:
-        file_msgs = [m for m in self.store.get_board_chat(self.current_board)
-                     if m.content_type == "file" and m.file_data]
-        for i, m in enumerate(file_msgs):
-            if m.id == msg.id:
-                return i + 1
-        return 0
+        return self._cached(("file_index", self.current_board), self._file_numbers).get(msg.id, 0)
+
+    def _file_numbers(self) -> dict[str, int]:
+        """Message id -> /save number for files in the current board chat."""
+        file_msgs = self.store.get_file_messages(self.current_board)
+        return {m.id: i for i, m in enumerate(file_msgs, 1)}
 
     # -- file sharing --------------------------------------------------
 
     MAX_FILE_SIZE = 45_000  # ~45KB raw, fits within 64KB after base64 + overhead
 
     def _send_file(self, filepath: str):
-        import base64
-        from pathlib import Path
         p = Path(filepath)
         if not p.exists():
             self._flash(f"file not found: {filepath}")
@@ -734,7 +1002,7 @@ class LimeTUI:
             self._flash(f"file too large ({size // 1024}KB > {self.MAX_FILE_SIZE // 1024}KB)")
             return
         data = p.read_bytes()
-        b64 = base64.b64encode(data).decode()
+        b64 = base64.b64encode(data).decode("ascii")
         display = f"[file: {p.name} ({size // 1024}KB)]"
         self.send_cb(
             display, "file", self.current_board,
@@ -745,10 +1013,7 @@ class LimeTUI:
         self._flash(f"sharing {p.name}...")
 
     def _save_file(self, idx: int, dest: str):
-        import base64
-        from pathlib import Path
-        msgs = self.store.get_board_chat(self.current_board)
-        file_msgs = [m for m in msgs if m.content_type == "file" and m.file_data]
+        file_msgs = self.store.get_file_messages(self.current_board)
         if idx < 0 or idx >= len(file_msgs):
             self._flash(f"file #{idx + 1} not found")
             return
@@ -760,39 +1025,40 @@ class LimeTUI:
 
     # -- help screen ---------------------------------------------------
 
+    _HELP_LINES = (
+        ("COMMANDS", True),
+        ("  /help           show this help", False),
+        ("  /t [title]      create a thread", False),
+        ("  /b [board]      switch boards", False),
+        ("  /boards         list boards", False),
+        ("  /threads        list threads", False),
+        ("  /reply # msg    reply to thread", False),
+        ("  /back           back to board", False),
+        ("  /dm @name msg   send a DM", False),
+        ("  /file path      share a file", False),
+        ("  /save # [path]  save a file", False),
+        ("  /connect h:p    connect to peer", False),
+        ("  @name           mention a user", False),
+        ("", False),
+        ("KEYBINDINGS", True),
+        ("  i / Enter    input mode", False),
+        ("  Esc / q      back / quit", False),
+        ("  t            thread list", False),
+        ("  d            toggle DMs", False),
+        ("  n            mentions filter", False),
+        ("  h            toggle header", False),
+        ("  ?            this help", False),
+        ("  1-9          enter thread", False),
+        ("  Up/Down      scroll", False),
+    )
+
     def _draw_help(self, top: int, bottom: int, W: int):
-        lines = [
-            ("COMMANDS", True),
-            ("  /help           show this help", False),
-            ("  /t [title]      create a thread", False),
-            ("  /b [board]      switch boards", False),
-            ("  /boards         list boards", False),
-            ("  /threads        list threads", False),
-            ("  /reply # msg    reply to thread", False),
-            ("  /back           back to board", False),
-            ("  /dm @name msg   send a DM", False),
-            ("  /file path      share a file", False),
-            ("  /save # [path]  save a file", False),
-            ("  /connect h:p    connect to peer", False),
-            ("  @name           mention a user", False),
-            ("", False),
-            ("KEYBINDINGS", True),
-            ("  i / Enter    input mode", False),
-            ("  Esc / q      back / quit", False),
-            ("  t            thread list", False),
-            ("  d            toggle DMs", False),
-            ("  n            mentions filter", False),
-            ("  h            toggle header", False),
-            ("  ?            this help", False),
-            ("  1-9          enter thread", False),
-            ("  Up/Down      scroll", False),
-        ]
-        for i, (text, is_header) in enumerate(lines):
+        for i, (text, is_header) in enumerate(self._HELP_LINES):
             r = top + i
             if r >= bottom:
                 break
             try:
-                attr = curses.color_pair(C_GREEN) | curses.A_BOLD if is_header else curses.color_pair(C_DIM)
+                attr = self._a_green_bold if is_header else self._a_dim
                 self._scr.addstr(r, 1, text[:W-2], attr)
             except curses.error:
                 pass
@@ -807,22 +1073,22 @@ class LimeTUI:
 
         try:
             self._scr.addstr(top, 1, "direct messages  [d] back to chat",
-                             curses.color_pair(C_DIM) | curses.A_DIM)
+                             self._a_faint)
         except curses.error:
             pass
 
         if not dms:
             try:
                 self._scr.addstr(top + 2, 2, "no DMs yet",
-                                 curses.color_pair(C_DIM))
+                                 self._a_dim)
                 self._scr.addstr(top + 3, 2, "use /dm @name message to send one",
-                                 curses.color_pair(C_DIM) | curses.A_DIM)
+                                 self._a_faint)
             except curses.error:
                 pass
             return
 
         start = max(0, len(dms) - (avail - 1))
-        for i, msg in enumerate(dms[start:]):
+        for i, msg in enumerate(islice(dms, start, None)):
             r = top + 1 + i
             if r >= bottom:
                 break
@@ -830,17 +1096,18 @@ class LimeTUI:
 
     # -- helpers -------------------------------------------------------
 
-    def _format_age(self, timestamp: float) -> str:
-        diff = max(0, int(time.time() - timestamp))
-        if diff < 60:
-            return f"{diff}s ago"
-        elif diff < 3600:
-            return f"{diff // 60}m ago"
-        else:
-            return f"{diff // 3600}h ago"
+    # (below, divisor, unit) for _format_age, checked in order.
+    _AGE_BUCKETS = ((60, 1, "s"), (3600, 60, "m"), (float("inf"), 3600, "h"))
+
+    def _format_age(self, timestamp: float, now: float | None = None) -> str:
+        diff = max(0, int((time.time() if now is None else now) - timestamp))
+        for below, div, unit in self._AGE_BUCKETS:
+            if diff < below:
+                return f"{diff // div}{unit} ago"
 
-    def _centered(self, y: int, text: str, attr=0):
-        _, W = self._scr.getmaxyx()
+    def _centered(self, y: int, text: str, attr=0, W: int | None = None):
+        if W is None:
+            _, W = self._scr.getmaxyx()
         x = max(0, (W - len(text)) // 2)
         try:
             self._scr.addstr(y, x, text, attr)
@@ -848,8 +1115,10 @@ class LimeTUI:
             pass
 
     def _hline(self, y: int, W: int):
+        if len(self._dashes) != W - 1:
+            self._dashes = "-" * (W - 1)
         try:
-            self._scr.addstr(y, 0, "-" * (W - 1), curses.color_pair(C_DIM) | curses.A_DIM)
+            self._scr.addstr(y, 0, self._dashes, self._a_faint)
         except curses.error:
             pass
 
@@ -871,3 +1140,11 @@ class LimeTUI:
         curses.init_pair(C_DIM, curses.COLOR_WHITE, -1)
         curses.init_pair(C_RED, curses.COLOR_RED, -1)
         curses.init_pair(C_YELLOW, curses.COLOR_YELLOW, -1)
+        # Every attribute the TUI draws with, resolved once; color_pair()
+        # needs the pairs above to exist.
+        self._a_green = curses.color_pair(C_GREEN)
+        self._a_green_bold = curses.color_pair(C_GREEN) | curses.A_BOLD
+        self._a_cyan_bold = curses.color_pair(C_CYAN) | curses.A_BOLD
+        self._a_red_bold = curses.color_pair(C_RED) | curses.A_BOLD
+        self._a_dim = curses.color_pair(C_DIM)
+        self._a_faint = curses.color_pair(C_DIM) | curses.A_DIM
@@ -5,20 +5,39 @@ Generates a local wallet (private key stored in ~/.lime/wallet.json),
 and submits PoW proofs to the LimeToken contract on Base to earn $LIME.
 """
 
+import asyncio
+import concurrent.futures
+import functools
+import importlib.util
 import json
+import os
+import stat
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 
-from lime.config import CHAIN_ID, CHAIN_RPC, LIME_CONTRACT, LIME_DIR, WALLET_FILE
+import orjson
 
-try:
-    from web3 import Web3
-    from eth_account import Account
-    HAS_WEB3 = True
-except ImportError:
-    HAS_WEB3 = False
+from lime.config import (
+    CHAIN_ID,
+    CHAIN_RPC,
+    LIME_CONTRACT,
+    LIME_DIR,
+    MULTICALL3_CONTRACT,
+    WALLET_FILE,
+)
+
+# web3 and eth_account take hundreds of ms to import, so they are only
+# located here and loaded by _ensure_web3() on first wallet use.
+HAS_WEB3 = all(importlib.util.find_spec(m) is not None for m in ("web3", "eth_account"))
+
+Web3 = Account = abi_encode = None
+_web3_loaded = False
 
-LIME_ABI = [
+# LimeToken's ABI, split by the path that uses it. Only the views are
+# bound to a contract object; the write calls are encoded by _calldata().
+_ABI_MINE = [
     {
         "inputs": [
             {"name": "payload", "type": "bytes"},
@@ -40,6 +59,9 @@ LIME_ABI = [
         "stateMutability": "nonpayable",
         "type": "function",
     },
+]
+
+_ABI_RELAY = [
     {
         "inputs": [],
         "name": "registerRelay",
@@ -47,6 +69,9 @@ LIME_ABI = [
         "stateMutability": "nonpayable",
         "type": "function",
     },
+]
+
+_ABI_VIEWS = [
     {
         "inputs": [{"name": "", "type": "address"}],
         "name": "balanceOf",
@@ -70,56 +95,345 @@ LIME_ABI = [
     },
 ]
 
+LIME_ABI = _ABI_MINE + _ABI_RELAY + _ABI_VIEWS
+
+# Multicall3.aggregate3: several view calls executed in one eth_call.
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+                "name": "calls",
+                "type": "tuple[]",
+            },
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+                "name": "returnData",
+                "type": "tuple[]",
+            },
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+]
+
+# LIME_ABI parsed once into name -> (4-byte selector, input types), so
+# calldata is built by ABI-encoding only the arguments instead of going
+# through the contract function wrappers and their ABI lookups.
+_CALLS: dict[str, tuple[bytes, list[str]]] = {}
+
+
+def _ensure_web3():
+    """Import web3/eth_account and parse LIME_ABI, once."""
+    global Web3, Account, abi_encode, _web3_loaded
+    if _web3_loaded:
+        return
+    from web3 import Web3
+    from eth_abi import encode as abi_encode
+    from eth_account import Account
+    from eth_utils import keccak
+    for fn in LIME_ABI:
+        types = [arg["type"] for arg in fn["inputs"]]
+        _CALLS[fn["name"]] = keccak(text=f"{fn['name']}({','.join(types)})")[:4], types
+    _web3_loaded = True
+
+
+def _calldata(name: str, *args) -> bytes:
+    """Calldata for LimeToken.name(*args)."""
+    selector, types = _CALLS[name]
+    return selector + abi_encode(types, args) if types else selector
+
+
+_contract = None    # LimeToken views bound to one provider, built on first use
+_multicall = None   # Multicall3 on the same provider
+
+
+def _get_contract():
+    global _contract
+    if _contract is None:
+        _ensure_web3()
+        import requests
+        from requests.adapters import HTTPAdapter
+        # One keep-alive pool, so repeat calls skip the TCP/TLS handshake.
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        w3 = Web3(Web3.HTTPProvider(CHAIN_RPC, session=session))
+        _contract = w3.eth.contract(
+            address=Web3.to_checksum_address(LIME_CONTRACT),
+            abi=_ABI_VIEWS,
+        )
+    return _contract
+
+
+def _get_multicall():
+    global _multicall
+    if _multicall is None:
+        _multicall = _get_contract().w3.eth.contract(
+            address=Web3.to_checksum_address(MULTICALL3_CONTRACT),
+            abi=MULTICALL3_ABI,
+        )
+    return _multicall
+
+
+def _read_uints(calls: list[tuple[str, list]]) -> list[int]:
+    """Run uint256 views of LimeToken, given as (name, args), in one eth_call."""
+    contract = _get_contract()
+    results = _get_multicall().functions.aggregate3([
+        (contract.address, False, _calldata(name, *args))
+        for name, args in calls
+    ]).call()
+    decode = contract.w3.codec.decode
+    return [decode(["uint256"], data)[0] for _success, data in results]
+
+
+class _NonceTracker:
+    """Next nonce per sender: fetched ("pending") once, then counted locally."""
+
+    __slots__ = ("_lock", "_next")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next: dict[str, int] = {}
+
+    def take(self, w3, address: str) -> int:
+        with self._lock:
+            n = self._next.get(address)
+            if n is None:
+                n = w3.eth.get_transaction_count(address, "pending")
+            self._next[address] = n + 1
+            return n
+
+    def prime(self, w3, address: str):
+        n = w3.eth.get_transaction_count(address, "pending")
+        with self._lock:
+            self._next[address] = n
+
+    def reset(self, address: str):
+        """Forget address's count so the next take() asks the node again."""
+        with self._lock:
+            self._next.pop(address, None)
+
+
+class _FeeCache:
+    """EIP-1559 fee fields from eth_feeHistory, refetched at most every ttl seconds.
+
+    maxFeePerGas is twice the next block's base fee plus the tip, which
+    rides out several full blocks of base-fee increases while cached.
+    """
+
+    __slots__ = ("ttl", "_fees", "_at")
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._fees: dict | None = None
+        self._at = 0.0
+
+    def get(self, w3) -> dict:
+        now = time.monotonic()
+        if self._fees is None or now - self._at >= self.ttl:
+            hist = w3.eth.fee_history(5, "latest", [10])
+            base = hist["baseFeePerGas"][-1]    # the pending block's
+            tip = max([r[0] for r in hist.get("reward") or () if r] or [0]) or 1
+            self._fees = {
+                "type": 2,
+                "maxFeePerGas": 2 * base + tip,
+                "maxPriorityFeePerGas": tip,
+            }
+            self._at = now
+        return self._fees
+
+
+_nonces = _NonceTracker()
+_fees = _FeeCache()
+
+
+def prime_nonce(address: str):
+    """Fetch address's pending nonce now, e.g. when a miner starts up."""
+    if not HAS_WEB3 or not LIME_CONTRACT:
+        return
+    try:
+        _nonces.prime(_get_contract().w3, address)
+    except Exception:
+        pass
+
+
+@functools.lru_cache(maxsize=256)
+def _checksum(address: str) -> str:
+    """Web3.to_checksum_address (a keccak per call) for repeat addresses."""
+    _ensure_web3()
+    return Web3.to_checksum_address(address)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_account(private_key: str):
+    """Account.from_key, whose public-key derivation is an EC multiply, once per key."""
+    _ensure_web3()
+    return Account.from_key(private_key)
+
+
+def _send(acct, data: bytes, gas: int) -> str:
+    """Sign and send LimeToken calldata from acct; returns the tx hash.
+
+    The transaction is filled in locally, with a fixed gas limit and the
+    cached nonce and fees, so the only RPC on the way is the send. A
+    failed send drops the cached nonce, since the node may not have
+    seen it.
+    """
+    contract = _get_contract()
+    w3 = contract.w3
+    nonce = _nonces.take(w3, acct.address)
+    try:
+        tx = {
+            "chainId": CHAIN_ID,
+            "nonce": nonce,
+            "to": contract.address,
+            "value": 0,
+            "data": data,
+            "gas": gas,
+            **_fees.get(w3),
+        }
+        signed = acct.sign_transaction(tx)
+        tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+    except Exception:
+        _nonces.reset(acct.address)
+        raise
+    return tx_hash.hex()
+
 
 def generate_wallet() -> tuple[str, str]:
     """Generate a new Ethereum keypair. Returns (address, private_key_hex)."""
     if not HAS_WEB3:
         raise RuntimeError("web3 not installed")
+    _ensure_web3()
     acct = Account.create()
     return acct.address, acct.key.hex()
 
 
 def save_wallet(address: str, private_key: str):
+    """Write the wallet atomically (temp file + os.replace); no-op if unchanged."""
     LIME_DIR.mkdir(parents=True, exist_ok=True)
-    WALLET_FILE.write_text(json.dumps({
+    data = json.dumps({
         "address": address,
         "private_key": private_key,
-    }, indent=2))
+    }, indent=2).encode()
+    try:
+        if WALLET_FILE.read_bytes() == data:
+            return
+    except OSError:
+        pass
+    tmp = WALLET_FILE.with_suffix(".tmp")
+    # Owner-only from creation, so the key is never briefly world-readable.
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IRUSR | stat.S_IWUSR)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, WALLET_FILE)
     try:
-        import os, stat
         os.chmod(WALLET_FILE, stat.S_IRUSR | stat.S_IWUSR)
     except Exception:
         pass
 
 
+_loaded: Optional[tuple[tuple, tuple[str, str]]] = None   # ((mtime_ns, size), wallet)
+
+
 def load_wallet() -> Optional[tuple[str, str]]:
+    """(address, private_key) from WALLET_FILE, reparsed only when it changes."""
+    global _loaded
     if not WALLET_FILE.exists():
         return None
     try:
-        data = json.loads(WALLET_FILE.read_text())
-        return data["address"], data["private_key"]
-    except Exception:
+        st = WALLET_FILE.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        if _loaded is not None and _loaded[0] == stamp:
+            return _loaded[1]
+        data = orjson.loads(WALLET_FILE.read_bytes())
+    except (OSError, ValueError):   # unreadable, or not JSON
+        return None
+    if not isinstance(data, dict) or "address" not in data or "private_key" not in data:
         return None
+    wallet = data["address"], data["private_key"]
+    _loaded = (stamp, wallet)
+    return wallet
+
+
+LIME_DECIMALS = 18
 
 
-def get_balance(address: str) -> Optional[float]:
-    """Get $LIME balance for an address. Returns None if contract not deployed."""
+def format_lime(wei: int, places: int = 2) -> str:
+    """wei as a $LIME amount, truncated to places decimals; integer math only."""
+    whole, frac = divmod(wei, 10 ** LIME_DECIMALS)
+    if places <= 0:
+        return str(whole)
+    return f"{whole}.{frac // 10 ** (LIME_DECIMALS - places):0{places}d}"
+
+
+def get_balance(address: str) -> Optional[int]:
+    """Get the $LIME balance of an address in wei. Returns None if contract not deployed."""
     if not HAS_WEB3 or not LIME_CONTRACT:
         return None
     try:
-        w3 = Web3(Web3.HTTPProvider(CHAIN_RPC))
-        contract = w3.eth.contract(
-            address=Web3.to_checksum_address(LIME_CONTRACT),
-            abi=LIME_ABI,
-        )
-        raw = contract.functions.balanceOf(
-            Web3.to_checksum_address(address)
+        raw = _get_contract().functions.balanceOf(
+            _checksum(address)
         ).call()
-        return raw / 1e18
+        return raw
     except Exception:
         return None
 
 
+def get_stats(address: str) -> Optional[dict]:
+    """Balance and total supply (wei) and relayed-message count in one round trip.
+
+    Reads go through Multicall3 as a single eth_call; nodes without it
+    get the same reads as a JSON-RPC batch.
+
+    Returns None if the contract is not deployed or the call fails.
+    """
+    if not HAS_WEB3 or not LIME_CONTRACT:
+        return None
+    try:
+        contract = _get_contract()
+        addr = _checksum(address)
+        try:
+            balance, supply, relayed = _read_uints([
+                ("balanceOf", [addr]), ("totalSupply", []), ("relayMessageCount", [addr]),
+            ])
+        except Exception:
+            with contract.w3.batch_requests() as batch:
+                batch.add(contract.functions.balanceOf(addr))
+                batch.add(contract.functions.totalSupply())
+                batch.add(contract.functions.relayMessageCount(addr))
+                balance, supply, relayed = batch.execute()
+        return {
+            "balance": balance,
+            "total_supply": supply,
+            "relay_messages": relayed,
+        }
+    except Exception:
+        return None
+
+
+async def get_balance_async(address: str) -> Optional[int]:
+    """get_balance without blocking the event loop on the RPC call."""
+    return await asyncio.to_thread(get_balance, address)
+
+
+async def get_stats_async(address: str) -> Optional[dict]:
+    """get_stats without blocking the event loop on the RPC call."""
+    return await asyncio.to_thread(get_stats, address)
+
+
 def submit_proof(
     private_key: str,
     payload: bytes,
@@ -135,58 +449,53 @@ def submit_proof(
         return None
 
     try:
-        w3 = Web3(Web3.HTTPProvider(CHAIN_RPC))
-        acct = Account.from_key(private_key)
-        contract = w3.eth.contract(
-            address=Web3.to_checksum_address(LIME_CONTRACT),
-            abi=LIME_ABI,
-        )
+        acct = _get_account(private_key)
 
         if relay_address:
-            fn = contract.functions.mineWithRelay(
-                payload, nonce, Web3.to_checksum_address(relay_address)
-            )
+            data = _calldata("mineWithRelay", payload, nonce, _checksum(relay_address))
         else:
-            fn = contract.functions.mine(payload, nonce)
-
-        tx = fn.build_transaction({
-            "from": acct.address,
-            "nonce": w3.eth.get_transaction_count(acct.address),
-            "gas": 150_000,
-            "gasPrice": w3.eth.gas_price,
-            "chainId": CHAIN_ID,
-        })
+            data = _calldata("mine", payload, nonce)
 
-        signed = acct.sign_transaction(tx)
-        tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-        return tx_hash.hex()
+        return _send(acct, data, 150_000)
     except Exception:
         return None
 
 
+_sender: concurrent.futures.ThreadPoolExecutor | None = None
+_sender_lock = threading.Lock()
+
+
+def _get_sender() -> concurrent.futures.ThreadPoolExecutor:
+    """One sender thread: proofs go out in order, so local nonces stay sequential."""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="lime-proof",
+            )
+    return _sender
+
+
+def submit_proof_async(
+    private_key: str,
+    payload: bytes,
+    nonce: int,
+    relay_address: Optional[str] = None,
+) -> concurrent.futures.Future:
+    """submit_proof on the background sender; the future resolves to its result.
+
+    Lets a miner go back to searching while the RPC round trip happens.
+    """
+    return _get_sender().submit(submit_proof, private_key, payload, nonce, relay_address)
+
+
 def register_relay(private_key: str) -> Optional[str]:
     """Register as a relay operator on-chain. Returns tx hash or None."""
     if not HAS_WEB3 or not LIME_CONTRACT:
         return None
 
     try:
-        w3 = Web3(Web3.HTTPProvider(CHAIN_RPC))
-        acct = Account.from_key(private_key)
-        contract = w3.eth.contract(
-            address=Web3.to_checksum_address(LIME_CONTRACT),
-            abi=LIME_ABI,
-        )
-
-        tx = contract.functions.registerRelay().build_transaction({
-            "from": acct.address,
-            "nonce": w3.eth.get_transaction_count(acct.address),
-            "gas": 100_000,
-            "gasPrice": w3.eth.gas_price,
-            "chainId": CHAIN_ID,
-        })
-
-        signed = acct.sign_transaction(tx)
-        tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-        return tx_hash.hex()
+        acct = _get_account(private_key)
+        return _send(acct, _calldata("registerRelay"), 100_000)
     except Exception:
         return None
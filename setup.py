@@ -0,0 +1,9 @@
+from setuptools import Extension, setup
+
+# The native PoW miner is optional: if no compiler is available the build
+# carries on and lime.message falls back to its pure-Python loop.
+setup(
+    ext_modules=[
+        Extension("lime._powmine", ["lime/_powmine.c"], optional=True),
+    ],
+)